@@ -1,7 +1,7 @@
 import sys
 import sentry_sdk
 import socketio
-from socketio.asyncio_pubsub_manager import AsyncPubSubManager
+from socketio.asyncio_manager import AsyncManager
 from sentry_sdk.integrations.asgi import SentryAsgiMiddleware
 from fastapi import FastAPI
 from fastapi.routing import APIRoute
@@ -13,6 +13,7 @@ if TYPE_CHECKING:
 
 # Application
 from app.config import settings, EnvironmentMode, LogLevel
+from app.constants.send_queue import SendQueuePolicy
 from app.utils import logger_init
 
 # Initial logger
@@ -27,7 +28,7 @@ __VERSION__ = "0.0.1"
 
 
 def create_socketio(
-    app: FastAPI, socketio_client: AsyncPubSubManager
+    app: FastAPI, socketio_client: AsyncManager
 ) -> socketio.AsyncServer:
     if settings.app.env_mode == EnvironmentMode.PROD:
         logger = False
@@ -36,13 +37,20 @@ def create_socketio(
         logger = True
         engineio_logger = True
 
-    sio = socketio.AsyncServer(
+    from app.socketio_managers import BoundedAsyncServer
+
+    sio = BoundedAsyncServer(
         async_mode="asgi",
         client_manager=socketio_client,
         logger=logger,
         engineio_logger=engineio_logger,
         cors_allowed_origins=settings.app.cors_allowed_origins,
+        max_send_queue=settings.socketio.send_queue_size,
+        disconnect_slow_clients=(
+            settings.socketio.send_queue_policy == SendQueuePolicy.DISCONNECT
+        ),
     )
+    app.socketio_server = sio
 
     # # * Register namespace * #
     from app.routers import TaskSocketIONamespace
@@ -126,6 +134,8 @@ def create_app() -> FastAPI:
     async def startup_event():
         logger.info("--- Startup Event ---")
         await app.container.services.init_resources()
+        await app.container.services.user_cache().start()
+        await app.container.services.task_websocket_manager().start()
         # * Socketio * #
         socketio_client = app.container.gateways.socketio_client()
         create_socketio(app, socketio_client=socketio_client)
@@ -133,6 +143,11 @@ def create_app() -> FastAPI:
     @app.on_event("shutdown")
     async def shutdown_event():
         logger.info("--- Shutdown Event ---")
+        await app.container.services.task_status_notifier().close()
+        await app.container.services.task_websocket_manager().close()
+        await app.container.services.user_cache().close()
+        app.container.services.password_hasher().shutdown()
+        app.container.services.task_publisher().shutdown()
         await app.container.services.shutdown_resources()
 
     return app
@@ -1,15 +1,20 @@
 import sentry_sdk
 import celery
-from typing import Any, Dict
+from typing import Any
 from loguru import logger
 from sentry_sdk.integrations.celery import CeleryIntegration
 from celery import current_app as current_celery_app
-from celery.result import AsyncResult
+from celery.backends.base import KeyValueStoreBackend
 from celery.signals import worker_process_init
 from kombu import Queue
 
 # Application
 from app.config import settings
+from app.broker.serializers import register_msgpack_ext, get_serializer
+from app.broker.publisher import TaskPublisher  # noqa: F401
+
+register_msgpack_ext()
+SERIALIZER, CONTENT_TYPE = get_serializer(settings.broker.serializer)
 
 # Inititalize
 @worker_process_init.connect
@@ -18,41 +23,29 @@ def worker_initialize(*args: Any, **kwargs: Any) -> None:
     sentry_sdk.init(dsn=settings.sentry.dns, integrations=[CeleryIntegration()])
 
 
-def get_task_info(task_id) -> Dict:
-    """
-    return task info according to the task_id
-    """
-    task = AsyncResult(task_id)
-    if task.state == "FAILURE":
-        error = str(task.result)
-        response = {
-            "state": task.state,
-            "error": error,
-        }
-    else:
-        response = {
-            "state": task.state,
-        }
-    return response
-
-
 # Configuration
 class CeleryConfiguration:
     broker_url = f"amqp://{settings.rabbitmq.username}:{settings.rabbitmq.password}@{settings.rabbitmq.host}:{settings.rabbitmq.port}//"
 
     result_backend = f"redis://{settings.redis.username}:{settings.redis.password}@{settings.redis.host}:{settings.redis.port}/{settings.redis.result_db}"
 
-    task_serializer = "pickle"
-    result_serializer = "pickle"
+    task_serializer = SERIALIZER
+    result_serializer = SERIALIZER
     event_serializer = "json"
-    accept_content = ["application/json", "application/x-python-serialize"]
-    result_accept_content = ["application/json", "application/x-python-serialize"]
+    accept_content = list(dict.fromkeys([CONTENT_TYPE, "application/json"]))
+    result_accept_content = accept_content
     result_expires = 1800
 
     task_queues = (Queue("p1"), Queue("p2"))
     task_default_queue = "p1"
     task_default_exchange = "Task"
     task_default_exchange_type = "direct"
+    # p1 keeps interactive tasks away from the long running ones on p2
+    task_routes = {
+        "app.broker.tasks.health_check": {"queue": "p1"},
+        "app.broker.tasks.long_trip_event": {"queue": "p2"},
+    }
+    worker_prefetch_multiplier = settings.broker.prefetch_multiplier
 
 
 def create_celery() -> celery:
@@ -60,3 +53,7 @@ def create_celery() -> celery:
     celery_app.config_from_object(CeleryConfiguration)
 
     return celery_app
+
+
+def get_result_backend() -> KeyValueStoreBackend:
+    return create_celery().backend
@@ -1,20 +1,16 @@
-from typing import Dict
-from celery.result import AsyncResult
+from typing import Any, Dict
+from celery import states
 
+# Custom state of a running task, its meta holds the progress
+PROGRESS = "PROGRESS"
 
-def get_task_info(task_id) -> Dict:
+
+def build_task_info(state: str, result: Any = None) -> Dict:
     """
-    return task info according to the task_id
+    return task info from a task state and its stored result
     """
-    task = AsyncResult(task_id)
-    if task.state == "FAILURE":
-        error = str(task.result)
-        response = {
-            "state": task.state,
-            "error": error,
-        }
-    else:
-        response = {
-            "state": task.state,
-        }
-    return response
+    if state == states.FAILURE:
+        return {"state": state, "error": str(result)}
+    if state == PROGRESS and isinstance(result, dict):
+        return {"state": state, "progress": result}
+    return {"state": state}
@@ -0,0 +1,74 @@
+import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional
+from loguru import logger
+from celery import Celery, Signature
+from celery.result import AsyncResult
+from kombu import Producer
+
+
+class TaskPublisher:
+    """Submit Celery tasks from async code without blocking the event loop.
+
+    `apply_async` is a synchronous AMQP publish, so it runs on one dedicated
+    thread. That thread keeps a producer from the app's pool for its whole
+    life, a submission costs one publish and no connection checkout.
+    """
+
+    __slots__ = ("_celery_app", "_executor", "_producer", "published", "failed")
+
+    def __init__(self, celery_app: Celery) -> None:
+        self._celery_app = celery_app
+        self._executor = ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="task-publisher"
+        )
+        # Only touched from the publisher thread
+        self._producer: Optional[Producer] = None
+        self.published = 0
+        self.failed = 0
+
+    def _get_producer(self) -> Producer:
+        if self._producer is None:
+            self._producer = self._celery_app.producer_pool.acquire(block=True)
+            logger.info("[TaskPublisher]::Producer acquired")
+        return self._producer
+
+    def _publish(self, signature: Signature, options: Dict[str, Any]) -> AsyncResult:
+        try:
+            result = signature.apply_async(producer=self._get_producer(), **options)
+        except Exception:
+            self.failed += 1
+            raise
+        self.published += 1
+        return result
+
+    def _publish_many(self, signatures: List[Signature]) -> List[AsyncResult]:
+        return [self._publish(signature, {}) for signature in signatures]
+
+    def _release(self) -> None:
+        if self._producer is not None:
+            self._producer.release()
+            self._producer = None
+
+    async def apply_async(self, signature: Signature, **options: Any) -> AsyncResult:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self._executor, functools.partial(self._publish, signature, options)
+        )
+
+    async def apply_many(self, signatures: List[Signature]) -> List[AsyncResult]:
+        """Publish the signatures in order, in one call on the publisher thread."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self._executor, functools.partial(self._publish_many, signatures)
+        )
+
+    def shutdown(self) -> None:
+        # Runs after any queued publish, the producer goes back to the pool
+        self._executor.submit(self._release)
+        self._executor.shutdown(wait=True)
+        logger.info(
+            f"[TaskPublisher]::Shutdown, published: {self.published}, "
+            f"failed: {self.failed}"
+        )
@@ -0,0 +1,65 @@
+import msgpack
+from datetime import date, datetime
+from typing import Any, Tuple
+from uuid import UUID
+from kombu import serialization
+
+# Application
+from app.config import CelerySerializer
+
+MSGPACK_EXT = "msgpack_ext"
+MSGPACK_EXT_CONTENT_TYPE = "application/x-msgpack-ext"
+
+# msgpack extension type codes
+EXT_DATETIME = 1
+EXT_DATE = 2
+EXT_UUID = 3
+
+
+def _default(obj: Any) -> msgpack.ExtType:
+    # datetime first, it is a subclass of date
+    if isinstance(obj, datetime):
+        return msgpack.ExtType(EXT_DATETIME, obj.isoformat().encode())
+    if isinstance(obj, date):
+        return msgpack.ExtType(EXT_DATE, obj.isoformat().encode())
+    if isinstance(obj, UUID):
+        return msgpack.ExtType(EXT_UUID, obj.bytes)
+    # Anything else is refused before the message is sent
+    raise TypeError(f"Object of type {type(obj).__name__} is not serializable")
+
+
+def _ext_hook(code: int, data: bytes) -> Any:
+    if code == EXT_DATETIME:
+        return datetime.fromisoformat(data.decode())
+    if code == EXT_DATE:
+        return date.fromisoformat(data.decode())
+    if code == EXT_UUID:
+        return UUID(bytes=data)
+    return msgpack.ExtType(code, data)
+
+
+def msgpack_dumps(obj: Any) -> bytes:
+    return msgpack.packb(obj, default=_default, use_bin_type=True)
+
+
+def msgpack_loads(data: bytes) -> Any:
+    return msgpack.unpackb(data, ext_hook=_ext_hook, raw=False, strict_map_key=False)
+
+
+def register_msgpack_ext() -> None:
+    serialization.register(
+        MSGPACK_EXT,
+        msgpack_dumps,
+        msgpack_loads,
+        content_type=MSGPACK_EXT_CONTENT_TYPE,
+        content_encoding="binary",
+    )
+
+
+def get_serializer(serializer: CelerySerializer) -> Tuple[str, str]:
+    """Kombu serializer name and content type for the configured serializer."""
+    if serializer == CelerySerializer.MSGPACK:
+        return MSGPACK_EXT, MSGPACK_EXT_CONTENT_TYPE
+    if serializer == CelerySerializer.PICKLE:
+        return "pickle", "application/x-python-serialize"
+    return "json", "application/json"
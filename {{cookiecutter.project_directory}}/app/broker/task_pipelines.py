@@ -1,8 +1,48 @@
 from uuid import UUID
+from celery.utils import uuid
+from typing import Dict, Iterable, List, Optional, Tuple
+
 # Application
 from app.broker import tasks
+from app.broker.publisher import TaskPublisher
+from app.services import TaskGroupService
+from app.constants import TaskPriority
+
+PRIORITY_QUEUES = {TaskPriority.HIGH: "p1", TaskPriority.LOW: "p2"}
+
+
+def queue_options(priority: Optional[TaskPriority]) -> Dict[str, str]:
+    # Without a priority the task routes decide the queue
+    return {"queue": PRIORITY_QUEUES[priority]} if priority else {}
 
 
-def long_trip(sleep_t: int) -> UUID:
-    task = tasks.long_trip_event.s(sleep_t).apply_async()
+async def long_trip(
+    publisher: TaskPublisher, sleep_t: int, priority: Optional[TaskPriority] = None
+) -> UUID:
+    task = await publisher.apply_async(
+        tasks.long_trip_event.s(sleep_t), **queue_options(priority)
+    )
     return task.id
+
+
+async def long_trip_batch(
+    publisher: TaskPublisher,
+    task_group_service: TaskGroupService,
+    specs: Iterable[Tuple[int, Optional[TaskPriority]]],
+) -> Tuple[str, List[str]]:
+    # IDs are assigned here, a frozen group would subscribe every member on
+    # the result backend from the event loop and never release them
+    group_id = uuid()
+    signatures = [
+        tasks.long_trip_event.s(sleep_t).set(
+            task_id=uuid(), group_id=group_id, **queue_options(priority)
+        )
+        for sleep_t, priority in specs
+    ]
+    task_ids = [signature.id for signature in signatures]
+    # The counters must exist before the first member finishes
+    await task_group_service.create_group(group_id, len(task_ids))
+
+    # All members go out in one publisher call on the same producer
+    await publisher.apply_many(signatures)
+    return group_id, task_ids
@@ -1,13 +1,13 @@
 import time
-from typing import Dict, Any
+from typing import Any, Callable, Dict
 from loguru import logger
-from celery import shared_task
-from celery.signals import task_postrun
+from celery import Task, shared_task, states
+from celery.signals import task_postrun, worker_process_shutdown
 from dependency_injector.wiring import inject, Provide
-from asgiref.sync import async_to_sync
 
 # application
-from app import utils, services
+from app import utils, services, repositories
+from app.socketio_managers import SocketioEmitter
 from app.broker import broker_utils
 from app.containers import Application
 
@@ -17,10 +17,24 @@ def health_check() -> Dict:
     return {"detail": "health"}
 
 
-@shared_task()
-def long_trip_event(sleep_t: int = 10) -> None:
+@inject
+def create_progress_reporter(
+    task: Task,
+    total: int,
+    task_progress_reporter: Callable[..., services.TaskProgressReporter] = Provide[
+        Application.services.task_progress_reporter.provider
+    ],
+) -> services.TaskProgressReporter:
+    return task_progress_reporter(task=task, total=total)
+
+
+@shared_task(bind=True)
+def long_trip_event(self: Task, sleep_t: int = 10) -> None:
     logger.info(f"[LongTripEvent]::Execute task time: {utils.get_utc_now()}")
-    time.sleep(sleep_t)
+    with create_progress_reporter(self, total=sleep_t) as progress:
+        for step in range(1, sleep_t + 1):
+            time.sleep(1)
+            progress.update(step)
     logger.info(f"[LongTripEvent]::Finished task time{utils.get_utc_now()}")
 
 
@@ -28,13 +42,37 @@ def long_trip_event(sleep_t: int = 10) -> None:
 @inject
 def long_trip_event_postrun(
     task_id: str,
-    task_socketio_manager: services.TaskSocketioManager = Provide[
-        Application.services.task_socketio_manager
+    state: str,
+    retval: Any,
+    task_socketio_emitter: services.TaskSocketioEmitter = Provide[
+        Application.services.task_socketio_emitter
+    ],
+    task_group_counter: repositories.TaskGroupCounter = Provide[
+        Application.services.task_group_counter
     ],
     **kwargs: Any,
 ):
-    task_state = broker_utils.get_task_info(task_id)
+    # The signal carries the final state, no need to read it back from the backend
+    task_state = broker_utils.build_task_info(state, retval)
     logger.info(f"[LongTripEvent]::{task_id} -> {task_state}")
-    async_to_sync(task_socketio_manager.emit_task_status)(
-        task_id=task_id, payload=task_state
-    )
+    task_socketio_emitter.emit_task_status(task_id=task_id, payload=task_state)
+
+    # Members of a batch also count towards the progress of their group
+    group_id = kwargs["task"].request.group
+    if group_id is None:
+        return
+    progress = task_group_counter.finish(group_id, failed=state != states.SUCCESS)
+    if progress is not None:
+        task_socketio_emitter.emit_task_group_progress(
+            group_id=group_id, payload=progress
+        )
+
+
+@worker_process_shutdown.connect
+@inject
+def flush_socketio_emitter(
+    socketio_emitter: SocketioEmitter = Provide[Application.gateways.socketio_emitter],
+    **kwargs: Any,
+) -> None:
+    # Publish emits still waiting for the batch window
+    socketio_emitter.close()
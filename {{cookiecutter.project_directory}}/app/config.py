@@ -3,6 +3,8 @@ from enum import Enum
 from typing import Optional, List
 from pydantic import BaseSettings, Field, AnyUrl
 
+from app.constants.send_queue import SendQueuePolicy
+
 # Log level
 class LogLevel(str, Enum):
     DEUBG = "DEBUG"
@@ -24,6 +26,15 @@ class JWT(BaseSettings):
     secret_key: str = Field(env="JWT_SECRET_KEY")
     algorithm: str = Field(env="JWT_ALGORITHM")
     expire_min: int = Field(120, env="JWT_EXPIRE_TIME_MINUTE")
+    # In-process cache of validated tokens
+    cache_size: int = Field(10000, env="JWT_CACHE_SIZE")
+    cache_ttl_seconds: int = Field(60, env="JWT_CACHE_TTL_SECONDS")
+
+
+# Password hashing
+class PasswordHashConfiguration(BaseSettings):
+    workers: int = Field(4, env="PASSWORD_HASH_WORKERS")
+    max_queue: int = Field(64, env="PASSWORD_HASH_MAX_QUEUE")
 
 
 # Application
@@ -52,6 +63,11 @@ class RedisConfiguration(BaseSettings):
     password: str = Field(env="REDIS_PASSWORD")
     backend_db: int = Field(0, env="REDIS_BACKEND_DB")
     result_db: int = Field(1, en="REDIS_RESULT_DB")
+    # In-process tier in front of the user cache
+    local_cache_size: int = Field(10000, env="REDIS_LOCAL_CACHE_SIZE")
+    local_cache_ttl_seconds: int = Field(5, env="REDIS_LOCAL_CACHE_TTL_SECONDS")
+    # Send the login cache write while the JWT is encoded
+    login_concurrent_write: bool = Field(True, env="REDIS_LOGIN_CONCURRENT_WRITE")
 
 
 # Redis Broadcaster
@@ -60,6 +76,87 @@ class BroadcasterConfiguration(BaseSettings):
     port: str = Field(env="BROADCASTER_PORT")
 
 
+# Celery
+class CelerySerializer(str, Enum):
+    MSGPACK = "msgpack"
+    JSON = "json"
+    PICKLE = "pickle"
+
+
+class BrokerConfiguration(BaseSettings):
+    # Task arguments and results
+    serializer: CelerySerializer = Field(
+        CelerySerializer.MSGPACK, env="CELERY_SERIALIZER"
+    )
+    # Set per worker pool, long running queues should use 1
+    prefetch_multiplier: int = Field(4, env="CELERY_PREFETCH_MULTIPLIER")
+    # Progress updates per second and task, the latest one is always kept
+    progress_max_rate: float = Field(2, env="CELERY_PROGRESS_MAX_RATE")
+
+
+# Socket.IO client manager
+class SocketioManagerType(str, Enum):
+    RABBITMQ = "rabbitmq"
+    REDIS = "redis"
+    MEMORY = "memory"
+
+
+# Task info replay buffer, redis streams are shared by all nodes
+class ReplayBufferType(str, Enum):
+    MEMORY = "memory"
+    REDIS = "redis"
+
+
+class SocketioConfiguration(BaseSettings):
+    manager: SocketioManagerType = Field(
+        SocketioManagerType.RABBITMQ, env="SOCKETIO_MANAGER"
+    )
+    channel: str = Field("socketio", env="SOCKETIO_CHANNEL")
+    # Emits are coalesced into one broker message per window (0 disables)
+    batch_window_ms: int = Field(5, env="SOCKETIO_BATCH_WINDOW_MS")
+    batch_max_size: int = Field(100, env="SOCKETIO_BATCH_MAX_SIZE")
+    # Also emit msgpack encoded binary payloads to "<room>:msgpack" sub rooms
+    msgpack: bool = Field(False, env="SOCKETIO_MSGPACK")
+    # Worker task status updates of one task within the window replace each other
+    # (0 disables), the batch window also conflates when set
+    task_status_conflation_ms: int = Field(0, env="SOCKETIO_TASK_STATUS_CONFLATION_MS")
+    # Worker (write-only) emitter, 0 publishes every emit immediately
+    emitter_batch_window_ms: int = Field(0, env="SOCKETIO_EMITTER_BATCH_WINDOW_MS")
+    # Engine.io packets queued per client; packets cannot be replaced in place, so
+    # any policy but "disconnect" drops the new emit once the queue is full
+    send_queue_size: int = Field(100, env="SOCKETIO_SEND_QUEUE_SIZE")
+    send_queue_policy: SendQueuePolicy = Field(
+        SendQueuePolicy.DROP_OLDEST, env="SOCKETIO_SEND_QUEUE_POLICY"
+    )
+    # Recent task_info messages per room replayed to rejoining clients
+    replay_buffer: ReplayBufferType = Field(
+        ReplayBufferType.MEMORY, env="SOCKETIO_REPLAY_BUFFER"
+    )
+    # Messages kept per room (0 disables)
+    replay_buffer_size: int = Field(100, env="SOCKETIO_REPLAY_BUFFER_SIZE")
+    replay_buffer_ttl_seconds: int = Field(
+        1800, env="SOCKETIO_REPLAY_BUFFER_TTL_SECONDS"
+    )
+
+
+# Raw websockets
+class WebsocketBroadcastType(str, Enum):
+    REDIS = "redis"
+    MEMORY = "memory"
+
+
+class WebsocketConfiguration(BaseSettings):
+    send_queue_size: int = Field(100, env="WEBSOCKET_SEND_QUEUE_SIZE")
+    send_queue_policy: SendQueuePolicy = Field(
+        SendQueuePolicy.DROP_OLDEST, env="WEBSOCKET_SEND_QUEUE_POLICY"
+    )
+    # Room messages reach the sockets of other processes (memory: this one only)
+    broadcast: WebsocketBroadcastType = Field(
+        WebsocketBroadcastType.MEMORY, env="WEBSOCKET_BROADCAST"
+    )
+    broadcast_channel: str = Field("websocket", env="WEBSOCKET_BROADCAST_CHANNEL")
+
+
 # Postgres
 class PostgresConfiguration(BaseSettings):
     host: str = Field(env="POSTGRES_HOST")
@@ -82,6 +179,9 @@ class Settings(BaseSettings):
     # JWT
     jwt: JWT = JWT()
 
+    # Password hashing
+    password_hash: PasswordHashConfiguration = PasswordHashConfiguration()
+
     # Sentry Monitor
     sentry: SentryConfiguration = SentryConfiguration()
 
@@ -97,6 +197,15 @@ class Settings(BaseSettings):
     # RabbitMQ
     rabbitmq: RabbitMQConfiguration = RabbitMQConfiguration()
 
+    # Celery
+    broker: BrokerConfiguration = BrokerConfiguration()
+
+    # Socket.IO
+    socketio: SocketioConfiguration = SocketioConfiguration()
+
+    # Websocket
+    websocket: WebsocketConfiguration = WebsocketConfiguration()
+
 
 @lru_cache(maxsize=50)
 def get_settings() -> Settings:
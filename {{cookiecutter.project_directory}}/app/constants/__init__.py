@@ -1,3 +1,6 @@
 from app.constants.responses import GET_USER_4XX_RESPONSES  # noqa: F401
 from app.constants.roles import RoleEnum  # noqa: F401
 from app.constants.error_codes import ERROR_CODES  # noqa: F401
+from app.constants.send_queue import SendQueuePolicy  # noqa: F401
+from app.constants.encoding import MessageEncoding  # noqa: F401
+from app.constants.task_priority import TaskPriority  # noqa: F401
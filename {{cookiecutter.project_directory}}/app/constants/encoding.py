@@ -0,0 +1,7 @@
+from enum import Enum
+
+
+class MessageEncoding(str, Enum):
+    JSON = "json"
+    # Binary frames / Socket.IO binary attachments, needs the msgpack package
+    MSGPACK = "msgpack"
@@ -0,0 +1,10 @@
+from enum import Enum
+
+
+class SendQueuePolicy(str, Enum):
+    # Discard the oldest queued message to make room
+    DROP_OLDEST = "drop_oldest"
+    # Replace the queued message with the same key, drop the oldest otherwise
+    COALESCE = "coalesce"
+    # Close the slow connection
+    DISCONNECT = "disconnect"
@@ -0,0 +1,8 @@
+from enum import Enum
+
+
+class TaskPriority(str, Enum):
+    # Interactive tasks, queue p1
+    HIGH = "high"
+    # Long running tasks, queue p2
+    LOW = "low"
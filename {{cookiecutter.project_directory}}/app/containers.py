@@ -2,18 +2,32 @@
 from dependency_injector import containers, providers
 
 # Application
-from app import repositories, services, db
+from app import repositories, services, db, broker
 
 
 class Gateways(containers.DeclarativeContainer):
     config = providers.Configuration()
     redis_client = providers.Resource(db.redis_init)
 
+    # Celery result backend
+    result_redis_client = providers.Resource(db.result_redis_init)
+    result_backend = providers.Singleton(broker.get_result_backend)
+    celery_app = providers.Singleton(broker.create_celery)
+
     # DB resource
     db_resource = providers.Resource(db.DBResource, connect_config=db.TORTOISE_ORM)
 
     # # SocketIO
     socketio_client = providers.Resource(db.socketio_init)
+    replay_buffer = providers.Singleton(
+        db.replay_buffer_init, redis_client=redis_client
+    )
+
+    # Raw websocket fan-out
+    websocket_broadcaster = providers.Singleton(db.websocket_broadcaster_init)
+
+    # Worker processes
+    socketio_emitter = providers.Singleton(db.socketio_emitter_init)
 
 
 class Services(containers.DeclarativeContainer):
@@ -30,6 +44,12 @@ class Services(containers.DeclarativeContainer):
 
     token_selector = providers.Resource(services.TokenSelector, jwt=jwt_manager)
 
+    password_hasher = providers.Singleton(
+        services.PasswordHasher,
+        max_workers=config.password_hash.workers,
+        max_queue=config.password_hash.max_queue,
+    )
+
     # * Repositories *#
     user_repo = providers.Singleton(repositories.UserRepo)
 
@@ -40,6 +60,8 @@ class Services(containers.DeclarativeContainer):
         repositories.UserCache,
         redis_client=gateways.redis_client,
         expired_time_min=config.jwt.expire_min,
+        local_cache_size=config.redis.local_cache_size,
+        local_cache_ttl_seconds=config.redis.local_cache_ttl_seconds,
     )
 
     auth_cache = providers.Singleton(
@@ -47,6 +69,23 @@ class Services(containers.DeclarativeContainer):
         redis_client=gateways.redis_client,
     )
 
+    task_result_cache = providers.Singleton(
+        repositories.TaskResultCache,
+        redis_client=gateways.result_redis_client,
+        result_backend=gateways.result_backend,
+    )
+
+    task_group_cache = providers.Singleton(
+        repositories.TaskGroupCache,
+        redis_client=gateways.result_redis_client,
+    )
+
+    # Worker processes
+    task_group_counter = providers.Singleton(
+        repositories.TaskGroupCounter,
+        redis_client=gateways.result_backend.provided.client,
+    )
+
     # * Services *#
     user_service = providers.Singleton(
         services.UserService,
@@ -65,6 +104,9 @@ class Services(containers.DeclarativeContainer):
         user_repo=user_repo,
         auth_cache=auth_cache,
         token_selector=token_selector,
+        password_hasher=password_hasher,
+        token_cache_size=config.jwt.cache_size,
+        token_cache_ttl_seconds=config.jwt.cache_ttl_seconds,
     )
 
     authorization_service = providers.Singleton(
@@ -73,12 +115,53 @@ class Services(containers.DeclarativeContainer):
         token_selector=token_selector,
     )
 
+    task_publisher = providers.Singleton(
+        broker.TaskPublisher, celery_app=gateways.celery_app
+    )
+
+    task_status_service = providers.Singleton(
+        services.TaskStatusService,
+        task_result_cache=task_result_cache,
+    )
+
+    task_group_service = providers.Singleton(
+        services.TaskGroupService,
+        task_group_cache=task_group_cache,
+    )
+
     # * Websocket *#
-    task_websocket_manager = providers.Singleton(services.TaskWebsocketManager)
+    task_websocket_manager = providers.Singleton(
+        services.TaskWebsocketManager,
+        send_queue_size=config.websocket.send_queue_size,
+        send_queue_policy=config.websocket.send_queue_policy,
+        broadcaster=gateways.websocket_broadcaster,
+    )
+
+    task_status_notifier = providers.Singleton(
+        services.TaskStatusNotifier,
+        task_result_cache=task_result_cache,
+        task_status_service=task_status_service,
+        websocket_manager=task_websocket_manager,
+    )
 
     # * SocketIO *#
     task_socketio_manager = providers.Singleton(
-        services.TaskSocketioManager, socketio_client=gateways.socketio_client
+        services.TaskSocketioManager,
+        socketio_client=gateways.socketio_client,
+        msgpack=config.socketio.msgpack,
+        replay_buffer=gateways.replay_buffer,
+    )
+
+    task_socketio_emitter = providers.Singleton(
+        services.TaskSocketioEmitter,
+        socketio_emitter=gateways.socketio_emitter,
+        msgpack=config.socketio.msgpack,
+    )
+
+    task_progress_reporter = providers.Factory(
+        services.TaskProgressReporter,
+        task_socketio_emitter=task_socketio_emitter,
+        max_rate=config.broker.progress_max_rate,
     )
 
 
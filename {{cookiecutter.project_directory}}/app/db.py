@@ -1,13 +1,30 @@
 import aioredis
 import socketio
-from socketio.asyncio_pubsub_manager import AsyncPubSubManager
-from typing import Dict, Any
+from typing import Dict, Any, Optional
 from loguru import logger
 from tortoise import Tortoise, connections
 from dependency_injector import resources
 
 # Configuration
-from app.config import settings
+from app import repositories
+from app.config import (
+    settings,
+    SocketioManagerType,
+    ReplayBufferType,
+    WebsocketBroadcastType,
+)
+from app.socketio_managers import (
+    BatchingAioPikaManager,
+    BatchingRedisManager,
+    PersistentKombuManager,
+    RoomRoutingSyncRedisManager,
+    SocketioEmitter,
+)
+from app.websocket_broadcast import (
+    WebsocketBroadcaster,
+    MemoryBroadcaster,
+    RedisBroadcaster,
+)
 
 db_model_list = ["app.models"]
 
@@ -17,6 +34,11 @@ def get_redis_url() -> str:
     return url
 
 
+def get_result_redis_url() -> str:
+    url = f"redis://{settings.redis.username}:{settings.redis.password}@{settings.redis.host}:{settings.redis.port}/{settings.redis.result_db}"
+    return url
+
+
 def get_pg_url() -> str:
     url = f"postgres://{settings.pg.username}:{settings.pg.password}@{settings.pg.host}:{settings.pg.port}/{settings.pg.db}"
     return url
@@ -27,6 +49,11 @@ def get_amqp_url() -> str:
     return url
 
 
+def get_broadcaster_url() -> str:
+    url = f"redis://{settings.broadcaster.host}:{settings.broadcaster.port}/0"
+    return url
+
+
 def get_tortoise_config(db_url: str = None) -> Dict:
     config = {
         "connections": {"default": db_url if db_url else get_pg_url()},
@@ -54,11 +81,77 @@ def redis_init() -> aioredis:
     return redis_client
 
 
-# Use RabbitMQ Broker
-def socketio_init() -> AsyncPubSubManager:
-    connect_uri = get_amqp_url()
-    mgr = socketio.AsyncAioPikaManager(connect_uri)
-    return mgr
+# Celery result backend (raw bytes, decoded with the result serializer)
+def result_redis_init() -> aioredis:
+    connect_uri = get_result_redis_url()
+    redis_client = aioredis.from_url(connect_uri)
+    return redis_client
+
+
+# Socket.IO client manager (RabbitMQ / Redis broadcaster / in-memory)
+def socketio_init() -> socketio.AsyncManager:
+    config = settings.socketio
+    if config.manager == SocketioManagerType.MEMORY:
+        # Single node only, emits from other processes are not delivered
+        return socketio.AsyncManager()
+
+    batch_config = dict(
+        batch_window_ms=config.batch_window_ms,
+        batch_max_size=config.batch_max_size,
+    )
+    if config.manager == SocketioManagerType.REDIS:
+        return BatchingRedisManager(
+            get_broadcaster_url(), channel=config.channel, **batch_config
+        )
+
+    return BatchingAioPikaManager(
+        get_amqp_url(), channel=config.channel, **batch_config
+    )
+
+
+# Write-only Socket.IO emitter for Celery workers
+def socketio_emitter_init() -> SocketioEmitter:
+    config = settings.socketio
+    if config.manager == SocketioManagerType.REDIS:
+        mgr = RoomRoutingSyncRedisManager(
+            get_broadcaster_url(), channel=config.channel, write_only=True
+        )
+    elif config.manager == SocketioManagerType.RABBITMQ:
+        mgr = PersistentKombuManager(
+            get_amqp_url(), channel=config.channel, write_only=True
+        )
+    else:
+        mgr = None
+
+    return SocketioEmitter(
+        mgr,
+        batch_window_ms=config.emitter_batch_window_ms,
+        batch_max_size=config.batch_max_size,
+        conflation_window_ms=config.task_status_conflation_ms,
+    )
+
+
+# Socket.IO task info history (in-memory per node / redis streams)
+def replay_buffer_init(redis_client: aioredis) -> Optional[repositories.ReplayBuffer]:
+    config = settings.socketio
+    if config.replay_buffer_size <= 0:
+        return None
+
+    if config.replay_buffer == ReplayBufferType.REDIS:
+        return repositories.RedisReplayBuffer(
+            redis_client,
+            size=config.replay_buffer_size,
+            expired_time_seconds=config.replay_buffer_ttl_seconds,
+        )
+    return repositories.MemoryReplayBuffer(size=config.replay_buffer_size)
+
+
+# Raw websocket fan-out across app processes (Redis broadcaster / in-process)
+def websocket_broadcaster_init() -> WebsocketBroadcaster:
+    config = settings.websocket
+    if config.broadcast == WebsocketBroadcastType.REDIS:
+        return RedisBroadcaster(get_broadcaster_url(), channel=config.broadcast_channel)
+    return MemoryBroadcaster(channel=config.broadcast_channel)
 
 
 class DBResource(resources.AsyncResource):
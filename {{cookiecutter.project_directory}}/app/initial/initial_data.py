@@ -50,9 +50,8 @@ async def create_user(payload: Dict, roles: Iterable[RoleEnum]):
         user = User(**payload)
         await user.save()
 
-        for role in roles:
-            role_model = await get_role_by_name(role.value)
-            await user.roles.add(role_model)
+        role_models = await Role.filter(name__in=[role.value for role in roles])
+        await user.roles.add(*role_models)
 
         await User.get(id=user.id)
         logger.info("--- Create user successful ---")
@@ -3,3 +3,9 @@ from .user import UserRepository as UserRepo  # noqa: F401
 from .user import UserRoleRepository as UserRoleRepo  # noqa: F401
 from .user import UserCache  # noqa: F401
 from .auth import AuthCache  # noqa: F401
+from .task import TaskResultCache  # noqa: F401
+from .task import TaskGroupCache  # noqa: F401
+from .task import TaskGroupCounter  # noqa: F401
+from .replay import ReplayBuffer  # noqa: F401
+from .replay import MemoryReplayBuffer  # noqa: F401
+from .replay import RedisReplayBuffer  # noqa: F401
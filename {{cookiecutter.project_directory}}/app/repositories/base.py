@@ -1,4 +1,14 @@
-from typing import TypeVar, Generic, Type, Optional, Tuple, Any
+from typing import (
+    TypeVar,
+    Generic,
+    Type,
+    Optional,
+    Tuple,
+    Any,
+    AsyncIterator,
+    Dict,
+    List,
+)
 from tortoise.models import Model
 from loguru import logger
 
@@ -43,3 +53,46 @@ class CRUDBase(Generic[ModelType]):
             _model = await self.model.all().offset(offset).limit(limit)
         self.show_info(_model)
         return _model
+
+    def _after(self, after_id: Optional[Any]):
+        if after_id is None:
+            return self.model.all()
+        return self.model.filter(**{f"{self.model._meta.pk_attr}__gt": after_id})
+
+    async def get_after(
+        self,
+        *,
+        after_id: Optional[Any] = None,
+        limit: int = 100,
+        prefetch: Tuple[str] = None,
+    ) -> List[ModelType]:
+        """Keyset page: rows with a primary key greater than `after_id`"""
+        query = self._after(after_id).order_by(self.model._meta.pk_attr).limit(limit)
+        if prefetch:
+            query = query.prefetch_related(*prefetch)
+        _model = await query
+        self.show_info(_model)
+        return _model
+
+    async def iter_values(
+        self, *fields: str, after_id: Optional[Any] = None, batch_size: int = 1000
+    ) -> AsyncIterator[List[Dict]]:
+        """Walk the whole table in keyset batches of plain dicts.
+
+        Only one batch is held at a time and no model instance is built.
+        The primary key is always part of the returned rows.
+        """
+        pk = self.model._meta.pk_attr
+        fields = (pk, *(field for field in fields if field != pk))
+        while True:
+            rows = (
+                await self._after(after_id)
+                .order_by(pk)
+                .limit(batch_size)
+                .values(*fields)
+            )
+            if rows:
+                yield rows
+            if len(rows) < batch_size:
+                break
+            after_id = rows[-1][pk]
@@ -0,0 +1,114 @@
+import json
+import aioredis
+from abc import ABCMeta, abstractmethod
+from collections import OrderedDict, deque
+from loguru import logger
+from typing import Any, Deque, Dict, List, Tuple
+
+ReplayMessage = Tuple[int, Any]
+
+
+class ReplayBuffer(metaclass=ABCMeta):
+    """Bounded per-room history of emitted messages.
+
+    Every message gets a sequence number increasing per room, a joiner
+    passing the last one it saw gets everything newer that is still kept.
+    """
+
+    @abstractmethod
+    async def append(self, room: str, data: Any) -> int:
+        ...
+
+    @abstractmethod
+    async def since(self, room: str, last_seq: int) -> List[ReplayMessage]:
+        ...
+
+
+class MemoryReplayBuffer(ReplayBuffer):
+    """Ring buffers in process memory, for single node deployments.
+
+    Only the `max_rooms` most recently written rooms are kept. Their sequence
+    counters are not evicted, a room written again continues its numbering so
+    a client rejoining with an older `last_seq` still gets the new messages.
+    """
+
+    __slots__ = ("_size", "_max_rooms", "_rooms", "_last_seq")
+
+    def __init__(self, size: int = 100, max_rooms: int = 1000) -> None:
+        self._size = size
+        self._max_rooms = max_rooms
+        self._rooms: "OrderedDict[str, Deque[ReplayMessage]]" = OrderedDict()
+        self._last_seq: Dict[str, int] = {}
+
+    async def append(self, room: str, data: Any) -> int:
+        messages = self._rooms.get(room)
+        if messages is None:
+            messages = self._rooms[room] = deque(maxlen=self._size)
+        self._rooms.move_to_end(room)
+
+        seq = self._last_seq.get(room, 0) + 1
+        self._last_seq[room] = seq
+        messages.append((seq, data))
+
+        while len(self._rooms) > self._max_rooms:
+            self._rooms.popitem(last=False)
+        return seq
+
+    async def since(self, room: str, last_seq: int) -> List[ReplayMessage]:
+        messages = self._rooms.get(room, ())
+        return [(seq, data) for seq, data in messages if seq > last_seq]
+
+
+class RedisReplayBuffer(ReplayBuffer):
+    """One redis stream per room, shared by all nodes.
+
+    Entry IDs are `<seq>-0`, the sequence number comes from a counter next to
+    the stream, both are updated in one script so nodes never race on IDs.
+    The counter is kept far longer than the stream, so a room written again
+    after its stream expired does not restart at 1.
+    """
+
+    APPEND_SCRIPT = """
+    local seq = redis.call('INCR', KEYS[2])
+    redis.call('XADD', KEYS[1], 'MAXLEN', '~', ARGV[2], seq .. '-0', 'data', ARGV[1])
+    redis.call('EXPIRE', KEYS[1], ARGV[3])
+    redis.call('EXPIRE', KEYS[2], ARGV[4])
+    return seq
+    """
+    SEQ_EXPIRED_TIME = 30 * 24 * 3600
+
+    __slots__ = ("_redis_client", "_size", "_expired_time", "_append")
+
+    def __init__(
+        self, redis_client: aioredis, size: int = 100, expired_time_seconds: int = 1800
+    ) -> None:
+        self._redis_client = redis_client
+        self._size = size
+        self._expired_time = expired_time_seconds
+        self._append = redis_client.register_script(self.APPEND_SCRIPT)
+
+    @staticmethod
+    def _keys(room: str) -> List[str]:
+        key = f"replay:{room}"
+        return [key, f"{key}:seq"]
+
+    async def append(self, room: str, data: Any) -> int:
+        seq = await self._append(
+            keys=self._keys(room),
+            args=[
+                json.dumps(data),
+                self._size,
+                self._expired_time,
+                max(self.SEQ_EXPIRED_TIME, self._expired_time),
+            ],
+        )
+        logger.debug(f"[RedisReplayBuffer]::Append: {room}, seq: {seq}")
+        return int(seq)
+
+    async def since(self, room: str, last_seq: int) -> List[ReplayMessage]:
+        stream, _ = self._keys(room)
+        entries = await self._redis_client.xrange(stream, min=f"{last_seq + 1}-0")
+        return [
+            (int(entry_id.split("-")[0]), json.loads(fields["data"]))
+            for entry_id, fields in entries
+        ]
@@ -0,0 +1,125 @@
+import aioredis
+from loguru import logger
+from typing import Any, Dict, Iterable, List, Optional
+from celery.backends.base import KeyValueStoreBackend
+
+
+class TaskResultCache:
+    """Read side of the Celery redis result backend.
+
+    Keys and payloads follow the backend configured for the workers, so the
+    same serializer is used to decode what the workers stored and published.
+    """
+
+    __slots__ = ("_redis_client", "_result_backend", "_key_prefix")
+
+    def __init__(
+        self, redis_client: aioredis, result_backend: KeyValueStoreBackend
+    ) -> None:
+        self._redis_client = redis_client
+        self._result_backend = result_backend
+        self._key_prefix = self._task_key("")
+
+    def _task_key(self, task_id: str) -> bytes:
+        return self._result_backend.get_key_for_task(task_id)
+
+    def channel(self, task_id: str) -> bytes:
+        # The redis backend publishes every stored state on the key itself
+        return self._task_key(task_id)
+
+    def task_id_from_channel(self, channel: bytes) -> str:
+        return channel.replace(self._key_prefix, b"", 1).decode()
+
+    def decode(self, value: Any) -> Optional[Dict]:
+        if not value:
+            return None
+        return self._result_backend.decode_result(value)
+
+    def pubsub(self) -> aioredis.client.PubSub:
+        return self._redis_client.pubsub(ignore_subscribe_messages=True)
+
+    async def get(self, task_id: str) -> Optional[Dict]:
+        res = await self._redis_client.get(self._task_key(task_id))
+        logger.debug(f"[TaskResultCache]::Get: {task_id}")
+        return self.decode(res)
+
+    async def get_many(self, task_ids: Iterable[str]) -> List[Optional[Dict]]:
+        keys = [self._task_key(task_id) for task_id in task_ids]
+        if not keys:
+            return []
+        res = await self._redis_client.mget(keys)
+        logger.debug(f"[TaskResultCache]::Get many: {len(keys)}")
+        return [self.decode(value) for value in res]
+
+
+def task_group_key(group_id: str) -> str:
+    return f"task-group:{group_id}"
+
+
+def to_group_progress(group_id: str, counters: Dict) -> Optional[Dict]:
+    if not counters:
+        return None
+    progress = {
+        (key.decode() if isinstance(key, bytes) else key): int(value)
+        for key, value in counters.items()
+    }
+    return {"group_id": group_id, **progress}
+
+
+class TaskGroupCache:
+    """Progress counters of task groups, one redis hash per group.
+
+    The API stores the group size when it submits the group, the workers
+    count the finished members with `TaskGroupCounter`.
+    """
+
+    __slots__ = ("_redis_client", "_expired_time")
+
+    def __init__(
+        self, redis_client: aioredis, expired_time_seconds: int = 1800
+    ) -> None:
+        self._redis_client = redis_client
+        self._expired_time = expired_time_seconds
+
+    async def create(self, group_id: str, total: int) -> None:
+        key = task_group_key(group_id)
+        async with self._redis_client.pipeline(transaction=True) as pipe:
+            pipe.hset(key, mapping={"total": total, "completed": 0, "failed": 0})
+            pipe.expire(key, self._expired_time)
+            await pipe.execute()
+        logger.debug(f"[TaskGroupCache]::Create: {group_id}, total: {total}")
+
+    async def get(self, group_id: str) -> Optional[Dict]:
+        counters = await self._redis_client.hgetall(task_group_key(group_id))
+        return to_group_progress(group_id, counters)
+
+
+class TaskGroupCounter:
+    """Worker side of `TaskGroupCache`, on the synchronous result backend client.
+
+    The existence check and the increments run in one script, a hash expiring
+    in between would otherwise be recreated without its total and TTL.
+    """
+
+    FINISH_SCRIPT = """
+    if redis.call('EXISTS', KEYS[1]) == 0 then
+        return nil
+    end
+    redis.call('HINCRBY', KEYS[1], 'completed', 1)
+    redis.call('HINCRBY', KEYS[1], 'failed', ARGV[1])
+    return redis.call('HGETALL', KEYS[1])
+    """
+
+    __slots__ = ("_redis_client", "_finish")
+
+    def __init__(self, redis_client: Any) -> None:
+        self._redis_client = redis_client
+        self._finish = redis_client.register_script(self.FINISH_SCRIPT)
+
+    def finish(self, group_id: str, failed: bool = False) -> Optional[Dict]:
+        fields = self._finish(keys=[task_group_key(group_id)], args=[int(failed)])
+        if fields is None:
+            # Expired, or the group was not submitted through the batch API
+            return None
+        counters = dict(zip(fields[::2], fields[1::2]))
+        return to_group_progress(group_id, counters)
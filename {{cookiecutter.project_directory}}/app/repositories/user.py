@@ -1,12 +1,13 @@
+import asyncio
 import aioredis
 from loguru import logger
-from typing import Iterable, Optional, Any
+from typing import Dict, Iterable, List, Optional, Any, Set
 
 # Application
 from app.repositories import BaseRepository
 from app.models import User, Role
 from app.constants import RoleEnum
-from app.utils import get_utc_now, dt_to_string
+from app.utils import get_utc_now, dt_to_string, LRUCache
 
 
 class UserRepository(BaseRepository):
@@ -24,6 +25,28 @@ class UserRepository(BaseRepository):
     async def get_by_mail(self, email: str) -> Optional[User]:
         return await self.get(email=email)
 
+    async def get_by_mail_with_role_names(self, email: str) -> Optional[Dict]:
+        # One LEFT JOIN query, a row per role (or a single row without role)
+        rows = await self.model.filter(email=email).values(
+            "id",
+            "name",
+            "email",
+            "password_hash",
+            "is_active",
+            "is_admin",
+            role="roles__name",
+        )
+        if not rows:
+            return None
+
+        user = {k: v for k, v in rows[0].items() if k != "role"}
+        user["roles"] = [
+            getattr(row["role"], "value", row["role"])
+            for row in rows
+            if row["role"] is not None
+        ]
+        return user
+
     async def get_by_id_with_role(self, id: int) -> Optional[User]:
         return await self.get(id=id, prefetch=("roles",))
 
@@ -37,6 +60,24 @@ class UserRepository(BaseRepository):
     async def add_roles(self, user_model: User, role_models: Iterable[Role]) -> None:
         await user_model.roles.add(*role_models)
 
+    async def get_existing_mails(self, emails: Iterable[str]) -> Set[str]:
+        res = await self.model.filter(email__in=list(emails)).values_list(
+            "email", flat=True
+        )
+        return set(res)
+
+    async def bulk_create(self, payloads: Iterable[Dict]) -> List[User]:
+        """Insert all rows in batches and return them with their IDs"""
+        payloads = list(payloads)
+        await self.model.bulk_create(
+            [self.model(**payload) for payload in payloads], batch_size=1000
+        )
+        # bulk_create does not populate integer primary keys, read them back
+        emails = [payload["email"] for payload in payloads]
+        users = await self.model.filter(email__in=emails).only("id", "email")
+        logger.info(f"[UserRepository]::Bulk create: {len(users)}")
+        return users
+
 
 class UserRoleRepository(BaseRepository):
     def __init__(self):
@@ -45,6 +86,10 @@ class UserRoleRepository(BaseRepository):
     async def get_by_name(self, name: str) -> Optional[Role]:
         return await self.get(name=name)
 
+    async def add_users(self, role_model: Role, user_models: Iterable[User]) -> None:
+        # A single insert into the through table for the whole batch
+        await role_model.users.add(*user_models)
+
     async def get_by_user_id(self, user_id: int) -> Iterable[RoleEnum]:
         roles = await self.model.filter(users__id=user_id).values_list(
             "name", flat=True
@@ -53,29 +98,111 @@ class UserRoleRepository(BaseRepository):
 
 
 class UserCache:
-    __slots__ = ("_redis_client", "_expired_seconds")
+    """Logged-in users, kept in redis and mirrored in a short-lived local map.
 
-    def __init__(self, redis_client: aioredis, expired_time_min: int) -> None:
+    Deletes are broadcast on `invalidate_channel` so every replica drops its
+    local copy right away, the local TTL only bounds staleness if a message
+    is lost. The local map is only filled while the subscription is confirmed.
+    """
+
+    __slots__ = (
+        "_redis_client",
+        "_expired_seconds",
+        "_local_cache",
+        "_listener",
+        "_subscribed",
+    )
+
+    invalidate_channel = "user:invalidate"
+
+    def __init__(
+        self,
+        redis_client: aioredis,
+        expired_time_min: int,
+        local_cache_size: int = 10000,
+        local_cache_ttl_seconds: int = 5,
+    ) -> None:
         self._redis_client = redis_client
         self._expired_seconds = expired_time_min * 60
+        self._local_cache = LRUCache(
+            maxsize=local_cache_size, ttl=local_cache_ttl_seconds
+        )
+        self._listener: Optional[asyncio.Task] = None
+        self._subscribed = asyncio.Event()
 
     def _user_key(self, user_id: int) -> str:
         return f"user:{user_id}"
 
+    def _cache_locally(self, user_id: int, value: str) -> None:
+        # Only trust the local copy while invalidations are being received
+        if self._subscribed.is_set():
+            self._local_cache.set(user_id, value)
+
+    async def start(self, timeout: float = 1) -> None:
+        """Subscribe to invalidations, waiting up to `timeout` for the
+        confirmation. Until it arrives every read goes to redis."""
+        if self._listener is None or self._listener.done():
+            self._listener = asyncio.create_task(self._listen())
+        try:
+            await asyncio.wait_for(self._subscribed.wait(), timeout)
+        except asyncio.TimeoutError:
+            logger.warning("[UserCache]::Invalidation subscription not confirmed yet")
+
+    async def _listen(self) -> None:
+        while True:
+            pubsub = self._redis_client.pubsub()
+            try:
+                await pubsub.subscribe(self.invalidate_channel)
+                async for message in pubsub.listen():
+                    if message["type"] == "subscribe":
+                        self._subscribed.set()
+                    elif message["type"] == "message":
+                        self._local_cache.pop(int(message["data"]))
+
+            except aioredis.RedisError as e:
+                logger.warning(f"[UserCache]::Invalidation listener error: {e}")
+                # Missed messages can not be replayed, start over cold
+                self._subscribed.clear()
+                self._local_cache.clear()
+                await asyncio.sleep(1)
+
+            finally:
+                await pubsub.reset()
+
+    async def close(self) -> None:
+        if self._listener is not None:
+            self._listener.cancel()
+            self._listener = None
+        self._subscribed.clear()
+        self._local_cache.clear()
+
     async def save(self, user_id: int) -> bool:
-        now = get_utc_now()
+        now = dt_to_string(get_utc_now())
         res = await self._redis_client.setex(
-            self._user_key(user_id), self._expired_seconds, dt_to_string(now)
+            self._user_key(user_id), self._expired_seconds, now
         )
         logger.debug(f"[UserCache]::Save: {res}")
+        if res:
+            self._cache_locally(user_id, now)
         return res
 
     async def get(self, user_id: int) -> Optional[str]:
+        if (res := self._local_cache.get(user_id)) is not None:
+            return res
+
         res = await self._redis_client.get(self._user_key(user_id))
         logger.debug(f"[UserCache]::Get: {res}")
+        if res:
+            self._cache_locally(user_id, res)
         return res
 
     async def delete(self, user_id: int) -> int:
-        res = await self._redis_client.delete(self._user_key(user_id))
+        self._local_cache.pop(user_id)
+        async with self._redis_client.pipeline(transaction=True) as pipe:
+            res, _ = await (
+                pipe.delete(self._user_key(user_id))
+                .publish(self.invalidate_channel, user_id)
+                .execute()
+            )
         logger.debug(f"[UserCache]::Delete: {res}")
         return res
@@ -1,3 +1,4 @@
+import asyncio
 from fastapi import APIRouter, Depends, status, HTTPException, Query, Security
 from fastapi.security import OAuth2PasswordRequestForm
 from loguru import logger
@@ -29,6 +30,10 @@ auth_router = APIRouter(prefix="/auth", tags=["Authentication and Authorization"
             "model": GenericSchema.DetailResponse,
             "description": "Inactive account",
         },
+        503: {
+            "model": GenericSchema.DetailResponse,
+            "description": "Server busy",
+        },
     },
 )
 @inject
@@ -43,8 +48,8 @@ async def login(
     user_service: services.UserService = Depends(
         Provide[Application.services.user_service]
     ),
-    user_role_service: services.UserRoleService = Depends(
-        Provide[Application.services.user_role_service]
+    concurrent_cache_write: bool = Depends(
+        Provide[Application.config.redis.login_concurrent_write]
     ),
 ):
     current_user = await authenticate_service.authenticate_user(
@@ -57,16 +62,22 @@ async def login(
             status_code=status.HTTP_401_UNAUTHORIZED, detail="Inactive account"
         )
 
-    roles = await user_role_service.get_roles_by_user_id(current_user.id)
-
-    logger.debug(f"[Login]::Roles: {roles}")
+    logger.debug(f"[Login]::Roles: {current_user.roles}")
 
-    access_token: str = authorization_service.create_jwt_token(
-        user_id=current_user.id, scopes=roles
-    )
+    async def create_jwt_token() -> str:
+        return authorization_service.create_jwt_token(
+            user_id=current_user.id, scopes=current_user.roles
+        )
 
     try:
-        await user_service.save_user_in_cache(current_user.id)
+        if concurrent_cache_write:
+            # The cache write is sent first, the token is encoded while redis answers
+            _, access_token = await asyncio.gather(
+                user_service.save_user_in_cache(current_user.id), create_jwt_token()
+            )
+        else:
+            access_token = await create_jwt_token()
+            await user_service.save_user_in_cache(current_user.id)
     except exceptions.SaveError as e:
         logger.error(e)
         raise HTTPException(
@@ -85,6 +96,10 @@ async def login(
             "model": GenericSchema.DetailResponse,
             "description": "Duplicate email",
         },
+        503: {
+            "model": GenericSchema.DetailResponse,
+            "description": "Server busy",
+        },
     },
 )
 @inject
@@ -107,7 +122,7 @@ async def sign_in(
     try:
 
         quest_role_model = await user_role_service.get_role_by_name(RoleEnum.GUEST)
-        password_hash = authenticate_service.get_password_hash(
+        password_hash = await authenticate_service.hash_password(
             password=payload.password
         )
         user_model = await user_service.create_user(
@@ -1,12 +1,18 @@
-from fastapi import APIRouter, Query
-from dependency_injector.wiring import inject
+from typing import List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from dependency_injector.wiring import inject, Provide
 
 # Application
+from app import services
+from app.containers import Application
 from app.schemas import GenericSchema
-from app.broker import task_pipelines
+from app.broker import task_pipelines, TaskPublisher
+from app.constants import TaskPriority
 
 event_router = APIRouter(prefix="/events")
 
+MAX_STATUS_IDS = 500
+
 
 @event_router.post(
     "/long-trip",
@@ -16,6 +22,76 @@ event_router = APIRouter(prefix="/events")
 @inject
 async def long_trip_event(
     t: int = Query(10, ge=10, le=20),
+    priority: Optional[TaskPriority] = Query(
+        None, description="Queue override, `high` (p1) or `low` (p2)"
+    ),
+    task_publisher: TaskPublisher = Depends(
+        Provide[Application.services.task_publisher]
+    ),
 ):
-    task_id = task_pipelines.long_trip(t)
+    task_id = await task_pipelines.long_trip(task_publisher, t, priority=priority)
     return {"task_id": task_id}
+
+
+@event_router.post(
+    "/long-trip/batch",
+    response_model=GenericSchema.TaskGroupResponse,
+    responses={
+        201: {
+            "model": GenericSchema.TaskGroupResponse,
+            "description": "Group ID and the task IDs in request order",
+        }
+    },
+)
+@inject
+async def long_trip_batch_event(
+    batch: GenericSchema.LongTripBatch,
+    task_publisher: TaskPublisher = Depends(
+        Provide[Application.services.task_publisher]
+    ),
+    task_group_service: services.TaskGroupService = Depends(
+        Provide[Application.services.task_group_service]
+    ),
+):
+    group_id, task_ids = await task_pipelines.long_trip_batch(
+        task_publisher,
+        task_group_service,
+        [(task.t, task.priority) for task in batch.tasks],
+    )
+    return {"group_id": group_id, "task_ids": task_ids}
+
+
+@event_router.get(
+    "/status",
+    response_model=List[GenericSchema.TaskInfo],
+    responses={
+        400: {
+            "model": GenericSchema.DetailResponse,
+            "description": "Too many task IDs",
+        },
+    },
+)
+@inject
+async def get_tasks_status(
+    ids: List[str] = Query(
+        ..., description="Task IDs, repeated or comma separated (`ids=a,b`)"
+    ),
+    task_status_service: services.TaskStatusService = Depends(
+        Provide[Application.services.task_status_service]
+    ),
+):
+    task_ids = list(
+        dict.fromkeys(
+            task_id.strip()
+            for value in ids
+            for task_id in value.split(",")
+            if task_id.strip()
+        )
+    )
+    if len(task_ids) > MAX_STATUS_IDS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Too many task IDs, maximum is {MAX_STATUS_IDS}",
+        )
+
+    return await task_status_service.get_many_task_info(task_ids)
@@ -1,4 +1,9 @@
-from fastapi import APIRouter
+from fastapi import APIRouter, Depends, Request
+from dependency_injector.wiring import inject, Provide
+
+# Application
+from app import services
+from app.containers import Application
 
 health_router = APIRouter(tags=["Health"])
 
@@ -6,3 +11,28 @@ health_router = APIRouter(tags=["Health"])
 @health_router.get("/health")
 async def healthy_check():
     return {"detail": "health"}
+
+
+@health_router.get("/health/ws")
+@inject
+async def websocket_send_queue_check(
+    request: Request,
+    task_websocket_manager: services.TaskWebsocketManager = Depends(
+        Provide[Application.services.task_websocket_manager]
+    ),
+):
+    socketio_server = getattr(request.app, "socketio_server", None)
+    return {
+        "websocket": task_websocket_manager.send_queue_stats(),
+        "socketio": socketio_server.send_queue_stats() if socketio_server else None,
+    }
+
+
+@health_router.get("/health/auth")
+@inject
+async def password_hasher_check(
+    password_hasher: services.PasswordHasher = Depends(
+        Provide[Application.services.password_hasher]
+    ),
+):
+    return {"password_hasher": password_hasher.stats()}
@@ -1,35 +1,216 @@
-from typing import List
-from fastapi import APIRouter, Depends, Query, Security
+import csv
+import io
+import json
+from enum import Enum
+from typing import AsyncIterator, Iterable, List, Optional
+from fastapi import (
+    APIRouter,
+    Body,
+    Depends,
+    HTTPException,
+    Query,
+    Response,
+    Security,
+    status,
+)
+from fastapi.responses import StreamingResponse
 from dependency_injector.wiring import inject, Provide
+from loguru import logger
 
 # Application
-from app import services
+from app import services, utils, exceptions
 from app.containers import Application
 from app.schemas import UserSchema, GenericSchema
 from app.security import get_current_user_in_cache
 from app.constants import RoleEnum, GET_USER_4XX_RESPONSES
+from app.constants.error_codes import ERROR_CODES
 
 user_router = APIRouter(prefix="/users", tags=["User"])
 
 
+USER_INFO_FIELDS = ("name", "email", "is_active", "is_admin")
+EXPORT_FIELDS = ("id", *USER_INFO_FIELDS)
+EXPORT_BATCH_SIZE = 5000
+MAX_IMPORT_USERS = 5000
+
+
+class ExportFormat(str, Enum):
+    csv = "csv"
+    ndjson = "ndjson"
+
+
+async def _users_ndjson(
+    user_service: services.UserService,
+    fields: Iterable[str],
+    *,
+    after_id: Optional[int] = None,
+    batch_size: int = 1000,
+) -> AsyncIterator[str]:
+    async for rows in user_service.iter_users(
+        *fields, after_id=after_id, batch_size=batch_size
+    ):
+        yield "".join(json.dumps(row) + "\n" for row in rows)
+
+
+async def _users_csv(
+    user_service: services.UserService,
+    fields: Iterable[str],
+    *,
+    batch_size: int = 1000,
+) -> AsyncIterator[str]:
+    fields = tuple(fields)
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(fields)
+    async for rows in user_service.iter_users(*fields, batch_size=batch_size):
+        writer.writerows([row[field] for field in fields] for row in rows)
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+
+    if buffer.tell():  # header only, the table is empty
+        yield buffer.getvalue()
+
+
 @user_router.get(
     "",
     dependencies=[Security(get_current_user_in_cache, scopes=[RoleEnum.SUPER_ADMIN])],
     response_model=List[UserSchema.UserInfo],
-    responses={**GET_USER_4XX_RESPONSES},
+    responses={
+        **GET_USER_4XX_RESPONSES,
+        400: {"model": GenericSchema.DetailResponse, "description": "Invalid cursor"},
+    },
+    description="Without `offset`, pages are ordered by ID and the token for the "
+    "next page is returned in the `X-Next-Cursor` header. "
+    "`stream=true` returns every user after `cursor` as NDJSON.",
 )
 @inject
 async def get_all_users(
-    offset: int = Query(0, ge=0),
+    response: Response,
+    offset: int = Query(0, ge=0, description="Deprecated, use `cursor`"),
     limit: int = Query(100, gt=0, le=100),
+    cursor: Optional[str] = Query(None, description="`X-Next-Cursor` of last page"),
+    stream: bool = Query(False, description="Stream as NDJSON"),
     user_service: services.UserService = Depends(
         Provide[Application.services.user_service]
     ),
 ):
-    users = await user_service.get_all_users(offset=offset, limit=limit)
+    try:
+        after_id = utils.decode_cursor(cursor) if cursor else None
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor"
+        )
+
+    if stream:
+        return StreamingResponse(
+            _users_ndjson(user_service, USER_INFO_FIELDS, after_id=after_id),
+            media_type="application/x-ndjson",
+        )
+
+    if offset:
+        users = await user_service.get_all_users(offset=offset, limit=limit)
+        return users
+
+    users, next_id = await user_service.get_users_page(after_id=after_id, limit=limit)
+    if next_id is not None:
+        response.headers["X-Next-Cursor"] = utils.encode_cursor(next_id)
     return users
 
 
+@user_router.get(
+    "/export",
+    dependencies=[Security(get_current_user_in_cache, scopes=[RoleEnum.SUPER_ADMIN])],
+    response_class=StreamingResponse,
+    responses={**GET_USER_4XX_RESPONSES},
+)
+@inject
+async def export_users(
+    format: ExportFormat = Query(ExportFormat.csv),
+    user_service: services.UserService = Depends(
+        Provide[Application.services.user_service]
+    ),
+):
+    if format == ExportFormat.csv:
+        content = _users_csv(user_service, EXPORT_FIELDS, batch_size=EXPORT_BATCH_SIZE)
+        media_type = "text/csv"
+    else:
+        content = _users_ndjson(
+            user_service, EXPORT_FIELDS, batch_size=EXPORT_BATCH_SIZE
+        )
+        media_type = "application/x-ndjson"
+
+    return StreamingResponse(
+        content,
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="users.{format.value}"'},
+    )
+
+
+@user_router.post(
+    "/import",
+    dependencies=[Security(get_current_user_in_cache, scopes=[RoleEnum.SUPER_ADMIN])],
+    response_model=UserSchema.UserImportResponse,
+    responses={
+        **GET_USER_4XX_RESPONSES,
+        409: {
+            "model": GenericSchema.DetailResponse,
+            "description": "Emails were taken while importing",
+        },
+    },
+)
+@inject
+async def import_users(
+    payload: List[UserSchema.UserCreate] = Body(..., max_items=MAX_IMPORT_USERS),
+    activate: bool = Query(False, description="Create users already activated"),
+    user_service: services.UserService = Depends(
+        Provide[Application.services.user_service]
+    ),
+    user_role_service: services.UserRoleService = Depends(
+        Provide[Application.services.user_role_service]
+    ),
+    authenticate_service: services.AuthenticationService = Depends(
+        Provide[Application.services.authentication_service]
+    ),
+):
+    conflicts = await user_service.find_import_conflicts(payload)
+    conflict_indexes = {conflict.index for conflict in conflicts}
+    user_payloads = [
+        user for index, user in enumerate(payload) if index not in conflict_indexes
+    ]
+    if not user_payloads:
+        return {"created": 0, "conflicts": conflicts}
+
+    try:
+        quest_role_model = await user_role_service.get_role_by_name(RoleEnum.GUEST)
+        # Only hash the rows that will be inserted
+        password_hashes = await authenticate_service.hash_passwords(
+            [user.password for user in user_payloads]
+        )
+        created = await user_service.import_users(
+            user_payloads,
+            password_hashes,
+            role_model=quest_role_model,
+            is_active=activate,
+        )
+
+    except exceptions.SaveDBUserError as e:
+        logger.warning(e)
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Emails were taken while importing",
+        )
+
+    except exceptions.RoleNotFoundError as e:
+        logger.warning(e)
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error code: {ERROR_CODES.NOT_FOUND_ERROR.code}",
+        )
+
+    return {"created": created, "conflicts": conflicts}
+
+
 @user_router.get(
     "/me",
     response_model=UserSchema.UserInfoRoles,
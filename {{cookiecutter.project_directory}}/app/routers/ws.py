@@ -1,6 +1,13 @@
 from loguru import logger
 from typing import Any, Dict, Tuple, Optional
-from fastapi import APIRouter, WebSocket, Depends, WebSocketDisconnect, HTTPException
+from fastapi import (
+    APIRouter,
+    WebSocket,
+    Depends,
+    WebSocketDisconnect,
+    HTTPException,
+    Query,
+)
 from fastapi.security import SecurityScopes
 from dependency_injector.wiring import inject, Provide
 from socketio.asyncio_namespace import AsyncNamespace
@@ -9,6 +16,7 @@ from socketio.exceptions import ConnectionRefusedError
 # Application
 from app import services, security
 from app.schemas import UserSchema
+from app.constants.encoding import MessageEncoding
 from app.containers import Application
 
 ws_router = APIRouter()
@@ -19,6 +27,7 @@ ws_router = APIRouter()
 async def websocket_task_info_endpoint(
     websocket: WebSocket,
     room_id: str,
+    encoding: MessageEncoding = Query(MessageEncoding.JSON),
     task_websocket_manager: services.TaskWebsocketManager = Depends(
         Provide[Application.services.task_websocket_manager]
     ),
@@ -26,14 +35,15 @@ async def websocket_task_info_endpoint(
         Provide[Application.services.task_socketio_manager]
     ),
 ):
-    await task_websocket_manager.connect(websocket)
+    await task_websocket_manager.connect(websocket, room=room_id, encoding=encoding)
 
     try:
         while True:
             data = await websocket.receive_text()
             logger.info(f"Receive data: {data}")
             await task_socketio_manager.emit_task_info(payload=data, room_id=room_id)
-            await websocket.send_text("ok")
+            await task_websocket_manager.publish(room_id, data, exclude=websocket)
+            await task_websocket_manager.send(websocket, "ok")
 
     except WebSocketDisconnect:
         await task_websocket_manager.disconnect(websocket)
@@ -44,27 +54,33 @@ async def websocket_task_info_endpoint(
 async def websocket_task_status_endpoint(
     websocket: WebSocket,
     task_id: str,
+    encoding: MessageEncoding = Query(MessageEncoding.JSON),
     current_user: UserSchema.UserWithRoles = Depends(
         security.websocket_get_current_user
     ),
     task_websocket_manager: services.TaskWebsocketManager = Depends(
         Provide[Application.services.task_websocket_manager]
     ),
+    task_status_notifier: services.TaskStatusNotifier = Depends(
+        Provide[Application.services.task_status_notifier]
+    ),
 ):
     if current_user:
         logger.info(f"User connect: {current_user}")
-        await task_websocket_manager.connect(websocket)
+        await task_websocket_manager.connect(websocket, encoding=encoding)
 
         try:
+            await task_status_notifier.watch(websocket, task_id=task_id)
+            # State changes are pushed, incoming messages only keep the socket alive
             while True:
                 data = await websocket.receive_text()
-                logger.info(f"Receive data: {data}")
-                await task_websocket_manager.update_task_status(
-                    websocket, task_id=task_id
-                )
-                await websocket.send_text("ok")
+                logger.debug(f"Receive data: {data}")
 
         except WebSocketDisconnect:
+            logger.info(f"User disconnect: {current_user}")
+
+        finally:
+            await task_status_notifier.unwatch(websocket, task_id=task_id)
             await task_websocket_manager.disconnect(websocket)
 
 
@@ -84,28 +100,129 @@ class TaskSocketIONamespace(AsyncNamespace):
         current_user = await self._authenticate(sid, auth)
         logger.info(f"User ID: {current_user.id}")
 
-    async def on_join_task_info_room(self, sid: str, payload: Dict) -> Tuple[str, int]:
+    @inject
+    async def on_join_task_info_room(
+        self,
+        sid: str,
+        payload: Dict,
+        task_socketio_manager: services.TaskSocketioManager = Provide[
+            Application.services.task_socketio_manager
+        ],
+    ) -> Tuple[str, int]:
         logger.info(f"[TaskNamespace]::Join task info room: {payload}")
-        self.enter_room(sid, payload["room_id"])
+        room_id = payload["room_id"]
+        if (last_seq := payload.get("last_seq")) is not None:
+            try:
+                last_seq = int(last_seq)
+            except (TypeError, ValueError):
+                return "invalid last_seq", 400
+
+        room = task_socketio_manager.room_for(room_id, payload.get("encoding"))
+        await task_socketio_manager.enter_room(sid, room)
+
+        # Rejoining clients get what they missed in one emit, joined first so
+        # nothing falls in between, duplicates are skipped client side by seq
+        if last_seq is not None:
+            messages = await task_socketio_manager.replay_task_info(room_id, last_seq)
+            await self.emit(
+                "task_info_replay",
+                task_socketio_manager.encode_for(messages, room),
+                to=sid,
+            )
         return "ok", 200
 
-    async def on_leave_task_info_room(self, sid: str, payload: Dict) -> Tuple[str, int]:
+    @inject
+    async def on_leave_task_info_room(
+        self,
+        sid: str,
+        payload: Dict,
+        task_socketio_manager: services.TaskSocketioManager = Provide[
+            Application.services.task_socketio_manager
+        ],
+    ) -> Tuple[str, int]:
         logger.info(f"[TaskNamespace]::Leave task info room: {payload}")
-        self.leave_room(sid, payload["room_id"])
+        for room in task_socketio_manager.rooms_of(payload["room_id"]):
+            self.leave_room(sid, room)
         return "ok", 200
 
+    @inject
     async def on_join_task_status_room(
-        self, sid: str, payload: Dict
+        self,
+        sid: str,
+        payload: Dict,
+        task_status_service: services.TaskStatusService = Provide[
+            Application.services.task_status_service
+        ],
+        task_socketio_manager: services.TaskSocketioManager = Provide[
+            Application.services.task_socketio_manager
+        ],
     ) -> Tuple[str, int]:
         logger.info(f"[TaskNamespace]::Join task status room: {payload}")
-        self.enter_room(sid, payload["room_id"])
+        task_id = payload["room_id"]
+        room = task_socketio_manager.room_for(task_id, payload.get("encoding"))
+        await task_socketio_manager.enter_room(sid, room)
+
+        # Join first, then send the current state, so a finished task is not missed
+        task_info = await task_status_service.get_task_info(task_id)
+        await self.emit(
+            "task_status", task_socketio_manager.encode_for(task_info, room), to=sid
+        )
         return "ok", 200
 
+    @inject
     async def on_leave_task_status_room(
-        self, sid: str, payload: Dict
+        self,
+        sid: str,
+        payload: Dict,
+        task_socketio_manager: services.TaskSocketioManager = Provide[
+            Application.services.task_socketio_manager
+        ],
     ) -> Tuple[str, int]:
         logger.info(f"[TaskNamespace]::Leave task status room: {payload}")
-        self.leave_room(sid, payload["room_id"])
+        for room in task_socketio_manager.rooms_of(payload["room_id"]):
+            self.leave_room(sid, room)
+        return "ok", 200
+
+    @inject
+    async def on_join_task_group_room(
+        self,
+        sid: str,
+        payload: Dict,
+        task_group_service: services.TaskGroupService = Provide[
+            Application.services.task_group_service
+        ],
+        task_socketio_manager: services.TaskSocketioManager = Provide[
+            Application.services.task_socketio_manager
+        ],
+    ) -> Tuple[str, int]:
+        logger.info(f"[TaskNamespace]::Join task group room: {payload}")
+        group_id = payload["room_id"]
+        room = task_socketio_manager.room_for(group_id, payload.get("encoding"))
+        await task_socketio_manager.enter_room(sid, room)
+
+        progress = await task_group_service.get_group_progress(group_id)
+        if progress is None:
+            self.leave_room(sid, room)
+            return "not found", 404
+        await self.emit(
+            "task_group_progress",
+            task_socketio_manager.encode_for(progress, room),
+            to=sid,
+        )
+        return "ok", 200
+
+    @inject
+    async def on_leave_task_group_room(
+        self,
+        sid: str,
+        payload: Dict,
+        task_socketio_manager: services.TaskSocketioManager = Provide[
+            Application.services.task_socketio_manager
+        ],
+    ) -> Tuple[str, int]:
+        logger.info(f"[TaskNamespace]::Leave task group room: {payload}")
+        for room in task_socketio_manager.rooms_of(payload["room_id"]):
+            self.leave_room(sid, room)
         return "ok", 200
 
     async def on_disconnect(self, sid: str) -> None:
@@ -1,4 +1,10 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
+from typing import Any, Dict, List, Optional
+
+# Application
+from app.constants.task_priority import TaskPriority
+
+MAX_BATCH_TASKS = 100
 
 
 class DetailResponse(BaseModel):
@@ -7,3 +13,24 @@ class DetailResponse(BaseModel):
 
 class TaskResponse(BaseModel):
     task_id: str
+
+
+class TaskGroupResponse(BaseModel):
+    group_id: str
+    task_ids: List[str]
+
+
+class LongTripTask(BaseModel):
+    t: int = Field(10, ge=10, le=20)
+    priority: Optional[TaskPriority] = None
+
+
+class LongTripBatch(BaseModel):
+    tasks: List[LongTripTask] = Field(..., min_items=1, max_items=MAX_BATCH_TASKS)
+
+
+class TaskInfo(BaseModel):
+    task_id: str
+    state: str
+    error: Optional[str] = None
+    progress: Optional[Dict[str, Any]] = None
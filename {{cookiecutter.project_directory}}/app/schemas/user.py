@@ -51,6 +51,21 @@ class UserInDB(UserInfo):
         orm_mode = True
 
 
+class UserInDBWithRoles(UserInDB):
+    roles: List[str] = Field([], description="User roles")
+
+
 class UserWithRoles(BaseModel):
     id: int
     roles: List[RoleEnum] = Field(..., description="User roles")
+
+
+class UserImportConflict(BaseModel):
+    index: int
+    email: str
+    reason: str
+
+
+class UserImportResponse(BaseModel):
+    created: int
+    conflicts: List[UserImportConflict]
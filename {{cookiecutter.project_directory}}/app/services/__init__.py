@@ -3,7 +3,13 @@ from .user import UserRoleService  # noqa: F401
 from .auth import JWTManager  # noqa: F401
 from .auth import TokenSelector  # noqa: F401
 from .auth import BaseAuthService  # noqa: F401
+from .auth import PasswordHasher  # noqa: F401
 from .auth import AuthenticationService  # noqa: F401
 from .auth import AuthorizationService  # noqa: F401
+from .task import TaskStatusService  # noqa: F401
+from .task import TaskGroupService  # noqa: F401
 from .ws import TaskSocketioManager  # noqa: F401
+from .ws import TaskSocketioEmitter  # noqa: F401
+from .ws import TaskProgressReporter  # noqa: F401
 from .ws import TaskWebsocketManager  # noqa: F401
+from .ws import TaskStatusNotifier  # noqa: F401
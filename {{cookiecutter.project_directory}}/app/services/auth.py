@@ -1,6 +1,20 @@
+import asyncio
+import hashlib
+import time
+from concurrent.futures import ThreadPoolExecutor
 from fastapi import HTTPException, status
 from fastapi.security import SecurityScopes
-from typing import Dict, Iterable
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    FrozenSet,
+    Iterable,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+)
 from jose import JWTError, jwt
 from passlib.context import CryptContext
 from loguru import logger
@@ -84,29 +98,176 @@ class BaseAuthService:
         return cls.pwd_context.hash(password)
 
 
+class PasswordHasher:
+    """Run bcrypt in a dedicated, size-limited thread pool.
+
+    bcrypt releases the GIL while hashing, so the pool scales with cores and
+    the event loop keeps serving websockets during a login burst. Once
+    `max_queue` jobs are waiting, new ones are rejected instead of queued.
+    """
+
+    busy_exception = HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail="Server busy, please retry later",
+        headers={"Retry-After": "1"},
+    )
+
+    __slots__ = (
+        "_executor",
+        "_max_workers",
+        "_max_queue",
+        "_pending",
+        "_bulk_slots",
+        "completed",
+        "failed",
+        "rejected",
+        "total_seconds",
+    )
+
+    def __init__(self, max_workers: int = 4, max_queue: int = 64) -> None:
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="password-hasher"
+        )
+        self._max_workers = max_workers
+        self._max_queue = max_queue
+        self._pending = 0
+        # Created on first use, inside the running loop
+        self._bulk_slots: Optional[asyncio.Semaphore] = None
+        self.completed = 0
+        self.failed = 0
+        self.rejected = 0
+        self.total_seconds = 0.0
+
+    async def _run(self, fn: Callable[..., Any], *args: Any) -> Any:
+        if self._pending >= self._max_workers + self._max_queue:
+            self.rejected += 1
+            logger.warning(f"[PasswordHasher]::Reject, pending: {self._pending}")
+            raise self.busy_exception
+
+        self._pending += 1
+        start = time.perf_counter()
+        try:
+            loop = asyncio.get_running_loop()
+            res = await loop.run_in_executor(self._executor, fn, *args)
+        except Exception:
+            self.failed += 1
+            raise
+        finally:
+            self._pending -= 1
+        self.completed += 1
+        self.total_seconds += time.perf_counter() - start
+        return res
+
+    async def verify(self, plain_password: str, hashed_password: str) -> bool:
+        return await self._run(
+            BaseAuthService._verify_password, plain_password, hashed_password
+        )
+
+    async def hash(self, password: str) -> str:
+        return await self._run(BaseAuthService.get_password_hash, password)
+
+    async def hash_many(
+        self, passwords: Sequence[str], *, chunk_size: int = 8
+    ) -> List[str]:
+        """Hash a batch in chunks, at most `max_workers - 1` of them at a time.
+
+        Bulk chunks count as pending jobs but skip the queue limit, the spare
+        worker and the queue stay free for logins.
+        """
+        if self._bulk_slots is None:
+            self._bulk_slots = asyncio.Semaphore(max(self._max_workers - 1, 1))
+        jobs = []
+        for start in range(0, len(passwords), chunk_size):
+            end = start + chunk_size
+            jobs.append(self._hash_chunk(passwords[start:end]))
+        results = await asyncio.gather(*jobs)
+        return [password_hash for chunk in results for password_hash in chunk]
+
+    async def _hash_chunk(self, passwords: Sequence[str]) -> List[str]:
+        async with self._bulk_slots:
+            self._pending += 1
+            start = time.perf_counter()
+            try:
+                loop = asyncio.get_running_loop()
+                hashes = await loop.run_in_executor(
+                    self._executor, self._hash_all, passwords
+                )
+            except Exception:
+                self.failed += len(passwords)
+                raise
+            finally:
+                self._pending -= 1
+            self.completed += len(passwords)
+            self.total_seconds += time.perf_counter() - start
+            return hashes
+
+    @staticmethod
+    def _hash_all(passwords: Sequence[str]) -> List[str]:
+        return [BaseAuthService.get_password_hash(password) for password in passwords]
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "pending": self._pending,
+            "queued": max(self._pending - self._max_workers, 0),
+            "completed": self.completed,
+            "failed": self.failed,
+            "rejected": self.rejected,
+            "avg_seconds": self.total_seconds / self.completed
+            if self.completed
+            else 0.0,
+        }
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=False)
+
+
 class AuthenticationService(BaseAuthService):
-    __slots__ = ("_user_repo", "_token_selector", "_auth_cache")
+    __slots__ = (
+        "_user_repo",
+        "_token_selector",
+        "_auth_cache",
+        "_password_hasher",
+        "_token_cache",
+    )
 
     def __init__(
         self,
         user_repo: repositories.UserRepo,
         token_selector: TokenSelector,
         auth_cache: repositories.AuthCache,
+        password_hasher: PasswordHasher,
+        token_cache_size: int = 10000,
+        token_cache_ttl_seconds: int = 60,
     ) -> None:
         self._user_repo = user_repo
         self._token_selector = token_selector
         self._auth_cache = auth_cache
+        self._password_hasher = password_hasher
+        # Token hash -> (user, scopes) of already verified JWTs
+        self._token_cache = utils.LRUCache(
+            maxsize=token_cache_size, ttl=token_cache_ttl_seconds
+        )
 
-    async def authenticate_user(self, email: str, password: str) -> UserSchema.UserInDB:
-        if (user := await self._user_repo.get_by_mail(email)) is None:
+    async def authenticate_user(
+        self, email: str, password: str
+    ) -> UserSchema.UserInDBWithRoles:
+        user = await self._user_repo.get_by_mail_with_role_names(email)
+        if user is None:
             logger.info("Invalid e-mail")
             raise self.invalid_username_or_password_exception
 
-        if not self._verify_password(password, user.password_hash):
+        password_hash = user.pop("password_hash")
+        if not await self._password_hasher.verify(password, password_hash):
             logger.info("Invalid password")
             raise self.invalid_username_or_password_exception
 
-        return UserSchema.UserInDB.from_orm(user)
+        return UserSchema.UserInDBWithRoles(**user)
+
+    async def hash_password(self, password: str) -> str:
+        return await self._password_hasher.hash(password)
+
+    async def hash_passwords(self, passwords: Sequence[str]) -> List[str]:
+        return await self._password_hasher.hash_many(passwords)
 
     async def authenticate_active_token(self, token: str) -> int:
         if user_id := await self._auth_cache.get_active_token(token):
@@ -117,9 +278,9 @@ class AuthenticationService(BaseAuthService):
         res = await self._auth_cache.delete_active_token(token)
         return res
 
-    async def authenticate_jwt(
-        self, security_scopes: SecurityScopes, token: str
-    ) -> UserSchema.UserWithRoles:
+    def _decode_jwt(
+        self, token: str
+    ) -> Tuple[UserSchema.UserWithRoles, FrozenSet[str], float]:
         # Decode JWT
         payload = self._token_selector.jwt.decode(token)
         # Get User ID
@@ -129,6 +290,23 @@ class AuthenticationService(BaseAuthService):
         user_scopes = payload.get("scopes", [])
         AuthSchema.JWTTokenData(user_id=user_id, scopes=user_scopes)
 
+        current_user = UserSchema.UserWithRoles(id=user_id, roles=user_scopes)
+        expires_in = payload["exp"] - time.time() if "exp" in payload else 0
+        return current_user, frozenset(user_scopes), expires_in
+
+    async def authenticate_jwt(
+        self, security_scopes: SecurityScopes, token: str
+    ) -> UserSchema.UserWithRoles:
+        token_key = hashlib.sha256(token.encode()).digest()
+        if (cached := self._token_cache.get(token_key)) is None:
+            current_user, user_scopes, expires_in = self._decode_jwt(token)
+            # Never keep a token around longer than it is valid
+            self._token_cache.set(
+                token_key, (current_user, user_scopes), ttl=expires_in
+            )
+        else:
+            current_user, user_scopes = cached
+
         if security_scopes.scopes:
             authenticate_value = f'Bearer scope="{security_scopes.scope_str}"'
         else:
@@ -142,7 +320,10 @@ class AuthenticationService(BaseAuthService):
                     headers={"WWW-Authenticate": authenticate_value},
                 )
 
-        return UserSchema.UserWithRoles(id=user_id, roles=user_scopes)
+        return current_user
+
+    def token_cache_info(self) -> Dict[str, int]:
+        return self._token_cache.info()
 
 
 class AuthorizationService(BaseAuthService):
@@ -0,0 +1,44 @@
+from typing import Dict, List, Optional
+from celery import states
+
+# Application
+from app import repositories
+from app.broker import broker_utils
+
+
+class TaskStatusService:
+    __slots__ = ("_task_result_cache",)
+
+    def __init__(self, task_result_cache: repositories.TaskResultCache) -> None:
+        self._task_result_cache = task_result_cache
+
+    @staticmethod
+    def to_task_info(meta: Optional[Dict]) -> Dict:
+        # Unknown task IDs have nothing stored yet, the same as Celery's PENDING
+        if meta is None:
+            return broker_utils.build_task_info(states.PENDING)
+        return broker_utils.build_task_info(meta["status"], meta.get("result"))
+
+    async def get_task_info(self, task_id: str) -> Dict:
+        meta = await self._task_result_cache.get(task_id)
+        return self.to_task_info(meta)
+
+    async def get_many_task_info(self, task_ids: List[str]) -> List[Dict]:
+        metas = await self._task_result_cache.get_many(task_ids)
+        return [
+            {"task_id": task_id, **self.to_task_info(meta)}
+            for task_id, meta in zip(task_ids, metas)
+        ]
+
+
+class TaskGroupService:
+    __slots__ = ("_task_group_cache",)
+
+    def __init__(self, task_group_cache: repositories.TaskGroupCache) -> None:
+        self._task_group_cache = task_group_cache
+
+    async def create_group(self, group_id: str, total: int) -> None:
+        await self._task_group_cache.create(group_id, total)
+
+    async def get_group_progress(self, group_id: str) -> Optional[Dict]:
+        return await self._task_group_cache.get(group_id)
@@ -1,6 +1,7 @@
-from typing import Iterable, Optional
+from typing import AsyncIterator, Dict, Iterable, List, Optional, Tuple
 from loguru import logger
 from tortoise.exceptions import IntegrityError
+from tortoise.transactions import atomic
 
 # Application
 from app import repositories, exceptions
@@ -59,6 +60,57 @@ class UserService:
 
         return user_model
 
+    async def find_import_conflicts(
+        self, user_payloads: List[UserSchema.UserCreate]
+    ) -> List[UserSchema.UserImportConflict]:
+        conflicts = []
+        seen: Dict[str, int] = {}
+        existing = await self._user_repo.get_existing_mails(
+            payload.email for payload in user_payloads
+        )
+        for index, payload in enumerate(user_payloads):
+            if payload.email in existing:
+                reason = "Duplicate email"
+            elif payload.email in seen:
+                reason = f"Same email as row {seen[payload.email]}"
+            else:
+                seen[payload.email] = index
+                continue
+            conflicts.append(
+                UserSchema.UserImportConflict(
+                    index=index, email=payload.email, reason=reason
+                )
+            )
+        return conflicts
+
+    @atomic()
+    async def import_users(
+        self,
+        user_payloads: List[UserSchema.UserCreate],
+        password_hashes: List[str],
+        *,
+        role_model: Role,
+        is_active: bool = False,
+    ) -> int:
+        rows = (
+            {
+                **payload.dict(exclude={"password", "verify_password"}),
+                "password_hash": password_hash,
+                "is_active": is_active,
+                "is_admin": False,
+            }
+            for payload, password_hash in zip(user_payloads, password_hashes)
+        )
+        try:
+            user_models = await self._user_repo.bulk_create(rows)
+            await self._user_role_repo.add_users(role_model, user_models)
+
+        except IntegrityError as e:  # Tortoise Integrity exceptions
+            logger.warning(e)
+            raise exceptions.SaveDBUserError(len(user_payloads))
+
+        return len(user_models)
+
     async def add_user_role(self, user_model: User, role_model: Iterable[Role]) -> None:
         await self._user_repo.add_roles(user_model, role_model)
 
@@ -73,6 +125,26 @@ class UserService:
         users = await self._user_repo.get_all(offset=offset, limit=limit)
         return users
 
+    async def get_users_page(
+        self, *, after_id: Optional[int] = None, limit: int = 100
+    ) -> Tuple[List[User], Optional[int]]:
+        # One extra row tells whether there is a next page
+        users = await self._user_repo.get_after(after_id=after_id, limit=limit + 1)
+        if len(users) > limit:
+            users = users[:limit]
+            return users, users[-1].id
+        return users, None
+
+    def iter_users(
+        self,
+        *fields: str,
+        after_id: Optional[int] = None,
+        batch_size: int = 1000,
+    ) -> AsyncIterator[List[Dict]]:
+        return self._user_repo.iter_values(
+            *fields, after_id=after_id, batch_size=batch_size
+        )
+
     async def get_user_with_roles(
         self, user_id: int
     ) -> Optional[UserSchema.UserInfoRoles]:
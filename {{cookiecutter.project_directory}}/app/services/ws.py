@@ -1,12 +1,207 @@
+import asyncio
+import itertools
+import time
+import weakref
+import aioredis
+from collections import OrderedDict
 from loguru import logger
-from typing import Any
+from typing import Any, Callable, Dict, Hashable, List, Optional, Set, Tuple, Union
 from abc import ABCMeta, abstractmethod
 from fastapi import WebSocket
-from socketio.asyncio_pubsub_manager import AsyncPubSubManager
+from socketio.asyncio_manager import AsyncManager
+from celery import Task, states
 
 # Application
-from app.broker import get_task_info
+from app import repositories, utils
+from app.broker import broker_utils
+from app.services.task import TaskStatusService
 from app.constants.socketio_namespaces import NamespaceEnum
+from app.constants.send_queue import SendQueuePolicy
+from app.constants.encoding import MessageEncoding
+from app.socketio_managers import RoomRoutingRedisManager, SocketioEmitter
+from app.websocket_broadcast import WebsocketBroadcaster
+
+
+class ConnectionRegistry:
+    """Room -> websockets index kept in process memory.
+
+    Sockets are held through weak references, so a connection that is
+    dropped without a clean `disconnect` does not keep its rooms alive.
+    """
+
+    __slots__ = ("_rooms", "_memberships")
+
+    def __init__(self) -> None:
+        self._rooms: Dict[str, "weakref.WeakSet[WebSocket]"] = {}
+        self._memberships: "weakref.WeakKeyDictionary[WebSocket, Set[str]]" = (
+            weakref.WeakKeyDictionary()
+        )
+
+    def join(self, room: str, websocket: WebSocket) -> None:
+        if (members := self._rooms.get(room)) is None:
+            members = self._rooms[room] = weakref.WeakSet()
+        members.add(websocket)
+        self._memberships.setdefault(websocket, set()).add(room)
+
+    def leave(self, room: str, websocket: WebSocket) -> None:
+        if (members := self._rooms.get(room)) is not None:
+            members.discard(websocket)
+            if not members:
+                del self._rooms[room]
+
+        if (rooms := self._memberships.get(websocket)) is not None:
+            rooms.discard(room)
+
+    def discard(self, websocket: WebSocket) -> None:
+        for room in self._memberships.pop(websocket, ()):
+            if (members := self._rooms.get(room)) is not None:
+                members.discard(websocket)
+                if not members:
+                    del self._rooms[room]
+
+    def members(self, room: str) -> List[WebSocket]:
+        if (members := self._rooms.get(room)) is None:
+            return []
+        return list(members)
+
+    def rooms(self, websocket: WebSocket) -> Set[str]:
+        return set(self._memberships.get(websocket, ()))
+
+    def count(self, room: str) -> int:
+        members = self._rooms.get(room)
+        return len(members) if members is not None else 0
+
+
+class SendQueue:
+    """Bounded outgoing queue of one websocket, drained by a single writer task.
+
+    A full queue never blocks the producer: depending on `policy` the oldest
+    message is dropped, a queued message with the same key is replaced, or the
+    connection is closed.
+    """
+
+    __slots__ = (
+        "websocket",
+        "encoding",
+        "maxsize",
+        "policy",
+        "dropped",
+        "peak_depth",
+        "evicted",
+        "_messages",
+        "_keys",
+        "_ready",
+        "_idle",
+        "_writer",
+        "_closed",
+        "_on_close",
+    )
+
+    # Try again later
+    SLOW_CONSUMER_CLOSE_CODE = 1013
+
+    def __init__(
+        self,
+        websocket: WebSocket,
+        *,
+        maxsize: int,
+        policy: SendQueuePolicy,
+        on_close: Callable[["SendQueue"], None],
+        encoding: MessageEncoding = MessageEncoding.JSON,
+    ) -> None:
+        self.websocket = websocket
+        self.encoding = encoding
+        self.maxsize = max(maxsize, 1)
+        self.policy = policy
+        self.dropped = 0
+        self.peak_depth = 0
+        # Closed by the disconnect policy
+        self.evicted = False
+        self._messages: "OrderedDict[Hashable, Union[str, bytes]]" = OrderedDict()
+        self._keys = itertools.count()
+        self._ready = asyncio.Event()
+        self._idle = asyncio.Event()
+        self._idle.set()
+        self._writer: Optional[asyncio.Task] = None
+        self._closed = False
+        self._on_close = on_close
+
+    @property
+    def depth(self) -> int:
+        return len(self._messages)
+
+    @property
+    def closed(self) -> bool:
+        return self._closed
+
+    def start(self) -> None:
+        self._writer = asyncio.create_task(self._run())
+
+    def put(
+        self, message: Union[str, bytes], *, key: Optional[Hashable] = None
+    ) -> bool:
+        if self._closed:
+            return False
+
+        queue_key: Hashable
+        if key is not None and self.policy == SendQueuePolicy.COALESCE:
+            queue_key = ("key", key)
+            if queue_key in self._messages:
+                # Keep the position in the queue, only the latest value is sent
+                self._messages[queue_key] = message
+                self.dropped += 1
+                return True
+        else:
+            queue_key = next(self._keys)
+
+        if len(self._messages) >= self.maxsize:
+            if self.policy == SendQueuePolicy.DISCONNECT:
+                logger.warning("[SendQueue]::Slow consumer, close connection")
+                asyncio.ensure_future(
+                    self.websocket.close(code=self.SLOW_CONSUMER_CLOSE_CODE)
+                )
+                self.evicted = True
+                self.close()
+                return False
+            self._messages.popitem(last=False)
+            self.dropped += 1
+
+        self._messages[queue_key] = message
+        self.peak_depth = max(self.peak_depth, len(self._messages))
+        self._idle.clear()
+        self._ready.set()
+        return True
+
+    async def join(self) -> None:
+        await self._idle.wait()
+
+    def close(self) -> None:
+        if self._closed:
+            return
+        self._closed = True
+        self._messages.clear()
+        self._idle.set()
+        if self._writer is not None and self._writer is not asyncio.current_task():
+            self._writer.cancel()
+        self._on_close(self)
+
+    async def _run(self) -> None:
+        try:
+            while True:
+                await self._ready.wait()
+                while self._messages:
+                    _, message = self._messages.popitem(last=False)
+                    if isinstance(message, bytes):
+                        await self.websocket.send_bytes(message)
+                    else:
+                        await self.websocket.send_text(message)
+                self._ready.clear()
+                self._idle.set()
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.warning(f"[SendQueue]::Drop socket: {e!r}")
+            self.close()
 
 
 class WebsocketManager(metaclass=ABCMeta):
@@ -20,43 +215,354 @@ class WebsocketManager(metaclass=ABCMeta):
 
 
 class TaskWebsocketManager(WebsocketManager):
-    async def connect(self, websocket: WebSocket) -> None:
+    """Raw websocket rooms of this process.
+
+    `broadcast` reaches the sockets connected here, `publish` also reaches
+    the sockets of the other processes through the broadcaster.
+    """
+
+    __slots__ = (
+        "_registry",
+        "_queues",
+        "_send_queue_size",
+        "_send_queue_policy",
+        "_dropped",
+        "_disconnected",
+        "_broadcaster",
+    )
+
+    def __init__(
+        self,
+        send_queue_size: int = 100,
+        send_queue_policy: SendQueuePolicy = SendQueuePolicy.DROP_OLDEST,
+        broadcaster: Optional[WebsocketBroadcaster] = None,
+    ) -> None:
+        self._registry = ConnectionRegistry()
+        self._queues: Dict[WebSocket, SendQueue] = {}
+        self._send_queue_size = send_queue_size
+        self._send_queue_policy = SendQueuePolicy(send_queue_policy)
+        # Totals of the queues that are already gone
+        self._dropped = 0
+        self._disconnected = 0
+        self._broadcaster = broadcaster
+
+    async def start(self) -> None:
+        if self._broadcaster is not None:
+            await self._broadcaster.start(self._on_remote_message)
+
+    async def close(self) -> None:
+        if self._broadcaster is not None:
+            await self._broadcaster.close()
+
+    @property
+    def registry(self) -> ConnectionRegistry:
+        return self._registry
+
+    async def connect(
+        self,
+        websocket: WebSocket,
+        *,
+        room: Optional[str] = None,
+        encoding: MessageEncoding = MessageEncoding.JSON,
+    ) -> None:
         logger.info("[TaskWebsocketManager]::Connect")
         await websocket.accept()
+        queue = self._queues[websocket] = SendQueue(
+            websocket,
+            maxsize=self._send_queue_size,
+            policy=self._send_queue_policy,
+            on_close=self._on_queue_close,
+            encoding=utils.negotiate_encoding(encoding),
+        )
+        queue.start()
+        if room is not None:
+            self._registry.join(room, websocket)
 
     async def disconnect(self, websocket: WebSocket) -> None:
         logger.info("[TaskWebsocketManager]::Disconnect")
+        self._registry.discard(websocket)
+        if (queue := self._queues.get(websocket)) is not None:
+            queue.close()
+
+    async def send(
+        self, websocket: WebSocket, payload: Any, *, key: Optional[Hashable] = None
+    ) -> bool:
+        """Queue `payload` for one socket, returns False if it is not connected."""
+        if (queue := self._queues.get(websocket)) is None:
+            return False
+        return queue.put(utils.encode_message(payload, queue.encoding), key=key)
+
+    async def broadcast(
+        self,
+        room: str,
+        payload: Any,
+        *,
+        exclude: Optional[WebSocket] = None,
+        key: Optional[Hashable] = None,
+    ) -> int:
+        """Queue `payload` for every socket in `room`, serializing it only once
+        per encoding.
+
+        Returns the number of sockets the message was queued for; slow sockets
+        never hold up the caller.
+        """
+        members = [ws for ws in self._registry.members(room) if ws is not exclude]
+        if not members:
+            return 0
+
+        messages: Dict[MessageEncoding, Union[str, bytes]] = {}
+        queued = 0
+        for websocket in members:
+            if (queue := self._queues.get(websocket)) is None:
+                self._registry.discard(websocket)
+                continue
+            if (message := messages.get(queue.encoding)) is None:
+                message = messages[queue.encoding] = utils.encode_message(
+                    payload, queue.encoding
+                )
+            if queue.put(message, key=key):
+                queued += 1
+        return queued
+
+    async def publish(
+        self,
+        room: str,
+        payload: Any,
+        *,
+        exclude: Optional[WebSocket] = None,
+        key: Optional[str] = None,
+    ) -> int:
+        """`broadcast` here and on every other process, returns the local count."""
+        queued = await self.broadcast(room, payload, exclude=exclude, key=key)
+        if self._broadcaster is not None:
+            await self._broadcaster.publish(room, payload, key=key)
+        return queued
+
+    async def _on_remote_message(
+        self, room: str, payload: Any, key: Optional[str]
+    ) -> None:
+        await self.broadcast(room, payload, key=key)
+
+    async def drain(self) -> None:
+        """Wait until every queued message has been written."""
+        await asyncio.gather(*(queue.join() for queue in list(self._queues.values())))
+
+    def send_queue_stats(self) -> Dict[str, int]:
+        queues = list(self._queues.values())
+        return {
+            "connections": len(queues),
+            "queued": sum(queue.depth for queue in queues),
+            "max_depth": max((queue.depth for queue in queues), default=0),
+            "peak_depth": max((queue.peak_depth for queue in queues), default=0),
+            "dropped": self._dropped + sum(queue.dropped for queue in queues),
+            "disconnected": self._disconnected,
+        }
+
+    def _on_queue_close(self, queue: SendQueue) -> None:
+        if self._queues.get(queue.websocket) is queue:
+            del self._queues[queue.websocket]
+        self._registry.discard(queue.websocket)
+        self._dropped += queue.dropped
+        if queue.evicted:
+            self._disconnected += 1
 
-    async def update_task_status(self, websocket: WebSocket, *, task_id: str) -> None:
-        task_stauts = get_task_info(task_id)
-        logger.info(f"[TaskWebsocketManager]::Update task status: {task_stauts}")
-        await websocket.send_json(task_stauts)
+
+class TaskStatusNotifier:
+    """Push task state transitions to the raw websocket watchers.
+
+    One redis pub/sub connection per process listens to the channels the
+    result backend publishes on, and only for tasks someone is watching.
+    Idle watchers cost nothing: there is no polling on either side.
+    """
+
+    __slots__ = (
+        "_task_result_cache",
+        "_task_status_service",
+        "_websocket_manager",
+        "_watchers",
+        "_subscribed",
+        "_pubsub",
+        "_reader",
+    )
+
+    def __init__(
+        self,
+        task_result_cache: repositories.TaskResultCache,
+        task_status_service: TaskStatusService,
+        websocket_manager: TaskWebsocketManager,
+    ) -> None:
+        self._task_result_cache = task_result_cache
+        self._task_status_service = task_status_service
+        self._websocket_manager = websocket_manager
+        self._watchers: Dict[str, int] = {}
+        # Tasks with a live subscription, finished tasks are dropped right away
+        self._subscribed: Set[str] = set()
+        self._pubsub: Optional[aioredis.client.PubSub] = None
+        self._reader: Optional[asyncio.Task] = None
+
+    @staticmethod
+    def room(task_id: str) -> str:
+        return f"task_status:{task_id}"
+
+    async def watch(self, websocket: WebSocket, *, task_id: str) -> None:
+        self._websocket_manager.registry.join(self.room(task_id), websocket)
+        self._watchers[task_id] = self._watchers.get(task_id, 0) + 1
+        if task_id not in self._subscribed:
+            await self._subscribe(task_id)
+
+        # Subscribe first, then send the current state, so nothing falls in between
+        task_info = await self._task_status_service.get_task_info(task_id)
+        await self._websocket_manager.send(websocket, task_info, key=self.room(task_id))
+
+    async def unwatch(self, websocket: WebSocket, *, task_id: str) -> None:
+        self._websocket_manager.registry.leave(self.room(task_id), websocket)
+        if (count := self._watchers.get(task_id, 0) - 1) > 0:
+            self._watchers[task_id] = count
+            return
+
+        self._watchers.pop(task_id, None)
+        await self._unsubscribe(task_id)
+
+    async def close(self) -> None:
+        if self._reader is not None:
+            self._reader.cancel()
+            self._reader = None
+        if self._pubsub is not None:
+            await self._pubsub.reset()
+            self._pubsub = None
+        self._subscribed.clear()
+
+    async def _subscribe(self, task_id: str) -> None:
+        if self._pubsub is None:
+            self._pubsub = self._task_result_cache.pubsub()
+        await self._pubsub.subscribe(self._task_result_cache.channel(task_id))
+        self._subscribed.add(task_id)
+
+        # The reader stops by itself once the last channel is unsubscribed
+        if self._reader is None or self._reader.done():
+            self._reader = asyncio.create_task(self._listen())
+
+    async def _unsubscribe(self, task_id: str) -> None:
+        if self._pubsub is None or task_id not in self._subscribed:
+            return
+        self._subscribed.discard(task_id)
+        await self._pubsub.unsubscribe(self._task_result_cache.channel(task_id))
+
+    async def _listen(self) -> None:
+        async for message in self._pubsub.listen():
+            if message["type"] != "message":
+                continue
+            try:
+                task_id = self._task_result_cache.task_id_from_channel(
+                    message["channel"]
+                )
+                meta = self._task_result_cache.decode(message["data"])
+                task_info = self._task_status_service.to_task_info(meta)
+                logger.info(f"[TaskStatusNotifier]::{task_id} -> {task_info}")
+                # Keyed by room, so a coalescing queue only keeps the latest state
+                room = self.room(task_id)
+                await self._websocket_manager.broadcast(room, task_info, key=room)
+
+                if meta and meta["status"] in states.READY_STATES:
+                    await self._unsubscribe(task_id)
+
+            except Exception as e:
+                logger.error(f"[TaskStatusNotifier]::Handle message error: {e!r}")
+
+
+def binary_encodings(msgpack: bool) -> List[MessageEncoding]:
+    encodings = [MessageEncoding.JSON]
+    if msgpack and utils.negotiate_encoding(MessageEncoding.MSGPACK) != encodings[0]:
+        encodings.append(MessageEncoding.MSGPACK)
+    return encodings
 
 
 class SocketioManager:
-    __slots__ = ("socketio_client",)
+    __slots__ = ("socketio_client", "encodings")
 
     namespace: NamespaceEnum
 
-    def __init__(self, socketio_client: AsyncPubSubManager) -> None:
+    def __init__(self, socketio_client: AsyncManager, msgpack: bool = False) -> None:
         self.socketio_client = socketio_client
+        # Clients asking for a binary encoding join a sub room per encoding
+        self.encodings = binary_encodings(msgpack)
+
+    def room_for(self, room: str, encoding: Optional[str]) -> str:
+        encoding = utils.negotiate_encoding(encoding)
+        if encoding not in self.encodings:
+            encoding = MessageEncoding.JSON
+        return utils.encoded_room(room, encoding)
+
+    def rooms_of(self, room: str) -> List[str]:
+        return [utils.encoded_room(room, encoding) for encoding in self.encodings]
+
+    async def enter_room(self, sid: str, room: str) -> None:
+        """Put `sid` in `room`, room emits reach it once this returns."""
+        namespace = f"/{self.namespace.value}"
+        if isinstance(self.socketio_client, RoomRoutingRedisManager):
+            await self.socketio_client.join_room(sid, namespace, room)
+        else:
+            self.socketio_client.enter_room(sid, namespace, room)
+
+    def encode_for(self, data: Any, room: str) -> Any:
+        """`data` as sent to the clients of the (sub) room `room`."""
+        for encoding in self.encodings[1:]:
+            if room.endswith(f":{encoding.value}"):
+                return utils.encode_message(data, encoding)
+        return data
 
     async def emit(
-        self, path: str, *, data: Any, room: str, namespace: NamespaceEnum
+        self,
+        path: str,
+        *,
+        data: Any,
+        room: str,
+        namespace: NamespaceEnum,
+        extra_args: Tuple = (),
     ) -> None:
+        # Extra arguments follow the (encoded) data as plain handler arguments
         await self.socketio_client.emit(
-            path, data=data, room=room, namespace=f"/{namespace.value}"
+            path,
+            data=(data, *extra_args) if extra_args else data,
+            room=room,
+            namespace=f"/{namespace.value}",
         )
+        for encoding in self.encodings[1:]:
+            encoded = utils.encode_message(data, encoding)
+            await self.socketio_client.emit(
+                path,
+                data=(encoded, *extra_args) if extra_args else encoded,
+                room=utils.encoded_room(room, encoding),
+                namespace=f"/{namespace.value}",
+            )
 
 
 class TaskSocketioManager(SocketioManager):
+    """Task namespace emitter.
+
+    With a replay buffer, task info messages are emitted as `(data, seq)` and
+    kept, so a client rejoining a room can ask for what it missed.
+    """
+
+    __slots__ = ("_replay_buffer",)
+
     namespace = NamespaceEnum.task
 
-    def __init__(self, socketio_client: AsyncPubSubManager) -> None:
-        super().__init__(socketio_client)
+    def __init__(
+        self,
+        socketio_client: AsyncManager,
+        msgpack: bool = False,
+        replay_buffer: Optional[repositories.ReplayBuffer] = None,
+    ) -> None:
+        super().__init__(socketio_client, msgpack=msgpack)
+        self._replay_buffer = replay_buffer
 
-    async def _emit_namespace(self, path: str, *, data: Any, room: str) -> None:
-        await self.emit(path, data=data, room=room, namespace=self.namespace)
+    async def _emit_namespace(
+        self, path: str, *, data: Any, room: str, extra_args: Tuple = ()
+    ) -> None:
+        await self.emit(
+            path, data=data, room=room, namespace=self.namespace, extra_args=extra_args
+        )
 
     async def emit_task_status(
         self,
@@ -68,4 +574,123 @@ class TaskSocketioManager(SocketioManager):
         await self._emit_namespace("task_status", data=payload, room=task_id)
 
     async def emit_task_info(self, *, payload: Any, room_id: str) -> None:
-        await self._emit_namespace("task_info", data=payload, room=room_id)
+        if self._replay_buffer is None:
+            await self._emit_namespace("task_info", data=payload, room=room_id)
+            return
+
+        seq = await self._replay_buffer.append(room_id, payload)
+        await self._emit_namespace(
+            "task_info", data=payload, room=room_id, extra_args=(seq,)
+        )
+
+    async def replay_task_info(self, room_id: str, last_seq: int) -> List[Dict]:
+        """Task info messages of `room_id` emitted after `last_seq`, oldest first.
+
+        The buffer is bounded, a first `seq` above `last_seq + 1` means older
+        messages were already dropped.
+        """
+        if self._replay_buffer is None:
+            return []
+        messages = await self._replay_buffer.since(room_id, last_seq)
+        return [{"seq": seq, "data": data} for seq, data in messages]
+
+
+class TaskSocketioEmitter:
+    """Synchronous task namespace emitter used by Celery workers.
+
+    Emits are keyed by room, so with a conflation window on the socketio
+    emitter a task status or group progress update replaces the previous one
+    still waiting for the same room.
+    """
+
+    __slots__ = ("socketio_emitter", "encodings")
+
+    namespace = NamespaceEnum.task
+
+    def __init__(
+        self, socketio_emitter: SocketioEmitter, msgpack: bool = False
+    ) -> None:
+        self.socketio_emitter = socketio_emitter
+        self.encodings = binary_encodings(msgpack)
+
+    def _emit(self, path: str, *, data: Any, room: str) -> None:
+        for encoding in self.encodings:
+            encoded_room = utils.encoded_room(room, encoding)
+            encoded_data = data
+            if encoding != MessageEncoding.JSON:
+                encoded_data = utils.encode_message(data, encoding)
+            self.socketio_emitter.emit(
+                path,
+                encoded_data,
+                namespace=f"/{self.namespace.value}",
+                room=encoded_room,
+                # Replaces an update of the same room still waiting in the batch
+                key=f"{path}:{encoded_room}",
+            )
+
+    def emit_task_status(self, *, task_id: str, payload: Any) -> None:
+        logger.info(f"[TaskSocketioEmitter]::Emit task status: {task_id}")
+        self._emit("task_status", data=payload, room=task_id)
+
+    def emit_task_group_progress(self, *, group_id: str, payload: Any) -> None:
+        logger.info(f"[TaskSocketioEmitter]::Emit task group progress: {group_id}")
+        self._emit("task_group_progress", data=payload, room=group_id)
+
+
+class TaskProgressReporter:
+    """Report the progress of a running task from inside its body.
+
+    An update is stored in the result backend as the `PROGRESS` state and
+    emitted to the task status room. At most `max_rate` updates per second
+    are sent. A throttled update is kept and sent by the next allowed one or
+    by `flush`, so the latest progress is never lost.
+    """
+
+    __slots__ = (
+        "_task",
+        "_task_socketio_emitter",
+        "total",
+        "_interval",
+        "_last_sent",
+        "_pending",
+    )
+
+    def __init__(
+        self,
+        task: Task,
+        task_socketio_emitter: TaskSocketioEmitter,
+        total: int,
+        max_rate: float = 2,
+    ) -> None:
+        self._task = task
+        self._task_socketio_emitter = task_socketio_emitter
+        self.total = total
+        self._interval = 1 / max_rate if max_rate > 0 else 0
+        self._last_sent: Optional[float] = None
+        self._pending: Optional[Dict] = None
+
+    def __enter__(self) -> "TaskProgressReporter":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.flush()
+
+    def update(self, current: int, **meta: Any) -> None:
+        self._pending = {"current": current, "total": self.total, **meta}
+        now = time.monotonic()
+        if self._last_sent is not None and now - self._last_sent < self._interval:
+            return
+        self._last_sent = now
+        self.flush()
+
+    def flush(self) -> None:
+        if self._pending is None:
+            return
+        meta, self._pending = self._pending, None
+
+        task_id = self._task.request.id
+        self._task.update_state(state=broker_utils.PROGRESS, meta=meta)
+        self._task_socketio_emitter.emit_task_status(
+            task_id=task_id,
+            payload=broker_utils.build_task_info(broker_utils.PROGRESS, meta),
+        )
@@ -0,0 +1,473 @@
+import asyncio
+import pickle
+import threading
+import time
+import socketio
+from collections import defaultdict
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    AsyncIterator,
+    Dict,
+    Hashable,
+    List,
+    Optional,
+    Set,
+    Tuple,
+)
+from loguru import logger
+from socketio.asyncio_redis_manager import aioredis
+from socketio.pubsub_manager import PubSubManager
+from socketio.redis_manager import redis
+
+BATCH_METHOD = "emit_batch"
+
+if TYPE_CHECKING:
+    # The mixin overrides, and calls through super(), the pub/sub manager hooks
+    from socketio.asyncio_pubsub_manager import AsyncPubSubManager as _PubSubManager
+else:
+    _PubSubManager = object
+
+
+def room_channel(channel: str, namespace: str, room: str) -> str:
+    return f"{channel}#{namespace}#{room}"
+
+
+def route_message(channel: str, data: Dict) -> List[Tuple[str, Dict]]:
+    """Pair a pub/sub message with the channel it is published on.
+
+    Room emits go to the room channel, batches are split per channel.
+    """
+
+    def channel_for(message: Dict) -> str:
+        room = message.get("room")
+        if message.get("method") == "emit" and isinstance(room, str):
+            return room_channel(channel, message.get("namespace") or "/", room)
+        return channel
+
+    if data.get("method") != BATCH_METHOD:
+        return [(channel_for(data), data)]
+
+    batches: Dict[str, List[Dict]] = defaultdict(list)
+    for message in data["messages"]:
+        batches[channel_for(message)].append(message)
+    return [
+        (c, messages[0] if len(messages) == 1 else {**data, "messages": messages})
+        for c, messages in batches.items()
+    ]
+
+
+class BatchingPubSubMixin(_PubSubManager):
+    """Coalesce ``emit`` messages published within a short window into a single
+    ``emit_batch`` broker message.
+
+    Must be mixed in before an ``AsyncPubSubManager`` subclass. Non emit messages
+    (disconnect, close_room, callback) flush the pending batch first so ordering
+    is preserved.
+    """
+
+    def __init__(
+        self,
+        *args: Any,
+        batch_window_ms: int = 5,
+        batch_max_size: int = 100,
+        **kwargs: Any,
+    ) -> None:
+        super().__init__(*args, **kwargs)
+        self.batch_window = max(batch_window_ms, 0) / 1000
+        self.batch_max_size = max(batch_max_size, 1)
+        self._batch: List[Dict] = []
+        self._flush_task: Optional[asyncio.Task] = None
+
+    async def _publish(self, data: Dict) -> None:
+        if not self.batch_window or data.get("method") != "emit":
+            await self.flush()
+            return await super()._publish(data)
+
+        self._batch.append(data)
+        if len(self._batch) >= self.batch_max_size:
+            await self.flush()
+        elif self._flush_task is None:
+            self._flush_task = asyncio.ensure_future(self._delayed_flush())
+
+    async def _delayed_flush(self) -> None:
+        try:
+            await asyncio.sleep(self.batch_window)
+        finally:
+            # Also runs on cancellation so that pending emits are not lost
+            if self._flush_task is asyncio.current_task():
+                self._flush_task = None
+            await self.flush()
+
+    async def flush(self) -> None:
+        if not self._batch:
+            return
+        messages, self._batch = self._batch, []
+        if self._flush_task is not None:
+            self._flush_task.cancel()
+            self._flush_task = None
+
+        if len(messages) == 1:
+            await super()._publish(messages[0])
+        else:
+            logger.debug(f"[{type(self).__name__}]::Publish {len(messages)} emits")
+            await super()._publish({"method": BATCH_METHOD, "messages": messages})
+
+    async def _listen(self) -> AsyncIterator[Any]:
+        async for message in super()._listen():
+            data = message
+            if isinstance(message, bytes):
+                try:
+                    data = pickle.loads(message)
+                except Exception:
+                    # Leave decoding to ``AsyncPubSubManager._thread``
+                    yield message
+                    continue
+
+            if isinstance(data, dict) and data.get("method") == BATCH_METHOD:
+                for item in data.get("messages", []):
+                    yield item
+            else:
+                yield data
+
+
+class BatchingAioPikaManager(BatchingPubSubMixin, socketio.AsyncAioPikaManager):
+    name = "batchingaiopika"
+
+
+class RoomRoutingRedisManager(socketio.AsyncRedisManager):
+    """Redis manager that publishes room emits on a per-room channel.
+
+    Each node subscribes to the channel of a room only while it hosts at least one
+    member of it, so a room emit reaches the nodes with subscribers instead of
+    every replica. Broadcasts and control messages keep using the main channel.
+
+    The private room of each client gets no channel: emits to a client of this
+    node are delivered directly, and an emit no node subscribed to, such as one
+    to a client of another node, is published again on the main channel.
+    """
+
+    name = "roomroutingaioredis"
+
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+        self._room_channels: Set[str] = set()
+        self._subscribed: Set[str] = set()
+        self._sync_task: Optional[asyncio.Task] = None
+
+    def room_channel(self, namespace: str, room: str) -> str:
+        return room_channel(self.channel, namespace, room)
+
+    def enter_room(
+        self, sid: str, namespace: str, room: Optional[str], eio_sid: str = None
+    ) -> None:
+        super().enter_room(sid, namespace, room, eio_sid=eio_sid)
+        if room != sid:
+            self._update_interest(namespace, room)
+
+    def leave_room(self, sid: str, namespace: str, room: Optional[str]) -> None:
+        super().leave_room(sid, namespace, room)
+        if room != sid:
+            self._update_interest(namespace, room)
+
+    async def join_room(self, sid: str, namespace: str, room: str) -> None:
+        """`enter_room` that returns once the room channel is subscribed, so an
+        emit right after the join is not missed."""
+        self.enter_room(sid, namespace, room)
+        if self._sync_task is not None and not self._sync_task.done():
+            await asyncio.shield(self._sync_task)
+
+    async def emit(
+        self,
+        event: str,
+        data: Any,
+        namespace: Optional[str] = None,
+        room: Optional[str] = None,
+        skip_sid: Optional[str] = None,
+        callback: Optional[Any] = None,
+        **kwargs: Any,
+    ) -> None:
+        # A client's own room has no channel, local clients are emitted to directly
+        if isinstance(room, str) and self.is_connected(room, namespace or "/"):
+            kwargs["ignore_queue"] = True
+        await super().emit(
+            event,
+            data,
+            namespace=namespace,
+            room=room,
+            skip_sid=skip_sid,
+            callback=callback,
+            **kwargs,
+        )
+
+    def _update_interest(self, namespace: str, room: Optional[str]) -> None:
+        if room is None or self.write_only:
+            return
+        channel = self.room_channel(namespace, room)
+        if room in self.rooms.get(namespace, {}):
+            if channel in self._room_channels:
+                return
+            self._room_channels.add(channel)
+        elif channel in self._room_channels:
+            self._room_channels.discard(channel)
+        else:
+            return
+
+        if self._sync_task is None or self._sync_task.done():
+            self._sync_task = asyncio.ensure_future(self._sync_subscriptions())
+
+    async def _sync_subscriptions(self) -> None:
+        while self._subscribed != self._room_channels:
+            wanted = self._room_channels - self._subscribed
+            unwanted = self._subscribed - self._room_channels
+            try:
+                if wanted:
+                    await self.pubsub.subscribe(*wanted)
+                if unwanted:
+                    await self.pubsub.unsubscribe(*unwanted)
+            except aioredis.exceptions.RedisError as e:
+                # The listener subscribes every hosted room again on reconnect
+                logger.error(f"[RoomRoutingRedisManager]::Subscribe error: {e!r}")
+                return
+            self._subscribed = (self._subscribed | wanted) - unwanted
+
+    async def _publish(self, data: Dict) -> None:
+        for channel, message in route_message(self.channel, data):
+            receivers = await self._publish_to(channel, message)
+            if receivers == 0 and channel != self.channel:
+                await self._publish_to(self.channel, message)
+
+    async def _publish_to(self, channel: str, data: Dict) -> Optional[int]:
+        retry = True
+        while True:
+            try:
+                if not retry:
+                    self._redis_connect()
+                return await self.redis.publish(channel, pickle.dumps(data))
+            except aioredis.exceptions.RedisError:
+                if retry:
+                    logger.error("[RoomRoutingRedisManager]::Publish error, retrying")
+                    retry = False
+                else:
+                    logger.error("[RoomRoutingRedisManager]::Publish error, giving up")
+                    return None
+
+    async def _listen(self) -> AsyncIterator[Any]:
+        retry_sleep = 1
+        while True:
+            try:
+                channels = set(self._room_channels)
+                await self.pubsub.subscribe(self.channel, *channels)
+                self._subscribed = channels
+                retry_sleep = 1
+                async for message in self.pubsub.listen():
+                    if message["type"] == "message" and "data" in message:
+                        yield message["data"]
+            except aioredis.exceptions.RedisError:
+                logger.error(
+                    f"[RoomRoutingRedisManager]::Receive error, retrying in {retry_sleep} secs"
+                )
+                await asyncio.sleep(retry_sleep)
+                retry_sleep = min(retry_sleep * 2, 60)
+                self._redis_connect()
+
+
+class BatchingRedisManager(BatchingPubSubMixin, RoomRoutingRedisManager):
+    name = "batchingaioredis"
+
+
+###############################################################################
+#                   Server
+###############################################################################
+
+
+class BoundedAsyncServer(socketio.AsyncServer):
+    """AsyncServer that bounds the engine.io packets queued for each client.
+
+    Queued packets cannot be replaced in place, so once a client is
+    `max_send_queue` packets behind, new emits to it are dropped or, with
+    `disconnect_slow_clients`, the client is disconnected.
+    """
+
+    def __init__(
+        self,
+        *args: Any,
+        max_send_queue: int = 100,
+        disconnect_slow_clients: bool = False,
+        **kwargs: Any,
+    ) -> None:
+        super().__init__(*args, **kwargs)
+        self.max_send_queue = max(max_send_queue, 1)
+        self.disconnect_slow_clients = disconnect_slow_clients
+        self._dropped = 0
+        self._disconnected = 0
+
+    async def _emit_internal(
+        self,
+        sid: str,
+        event: str,
+        data: Any,
+        namespace: Optional[str] = None,
+        id: Optional[int] = None,
+    ) -> None:
+        socket = self.eio.sockets.get(sid)
+        if socket is not None and socket.queue.qsize() >= self.max_send_queue:
+            if self.disconnect_slow_clients:
+                logger.warning(f"[BoundedAsyncServer]::Slow consumer {sid}, disconnect")
+                self._disconnected += 1
+                await self.eio.disconnect(sid)
+            else:
+                self._dropped += 1
+            return
+        await super()._emit_internal(sid, event, data, namespace=namespace, id=id)
+
+    def send_queue_stats(self) -> Dict[str, int]:
+        depths = [socket.queue.qsize() for socket in list(self.eio.sockets.values())]
+        return {
+            "connections": len(depths),
+            "queued": sum(depths),
+            "max_depth": max(depths, default=0),
+            "dropped": self._dropped,
+            "disconnected": self._disconnected,
+        }
+
+
+###############################################################################
+#                   Write-only (worker processes)
+###############################################################################
+
+
+class PersistentKombuManager(socketio.KombuManager):
+    """Kombu manager publishing over the producer's own connection instead of
+    opening a new one per message."""
+
+    name = "persistentkombu"
+
+    def _publish(self, data: Dict) -> None:
+        publish = self.producer.connection.ensure(
+            self.producer, self.producer.publish, max_retries=3
+        )
+        publish(pickle.dumps(data))
+
+
+class RoomRoutingSyncRedisManager(socketio.RedisManager):
+    """Synchronous counterpart of ``RoomRoutingRedisManager`` for publishing."""
+
+    name = "roomroutingredis"
+
+    def _publish(self, data: Dict) -> None:
+        for channel, message in route_message(self.channel, data):
+            try:
+                self.redis.publish(channel, pickle.dumps(message))
+            except redis.exceptions.RedisError:
+                logger.error("[RoomRoutingSyncRedisManager]::Publish error, retrying")
+                self._redis_connect()
+                self.redis.publish(channel, pickle.dumps(message))
+
+
+class SocketioEmitter:
+    """Synchronous write-only emitter for processes without a Socket.IO server.
+
+    With a batch window the emits are buffered and published as one
+    ``emit_batch`` message by a single background thread started on first use.
+    A conflation window buffers only keyed emits, which replace each other, and
+    publishes the rest immediately. Without a manager (in-memory deployments)
+    emits are dropped.
+    """
+
+    def __init__(
+        self,
+        manager: Optional[PubSubManager],
+        *,
+        batch_window_ms: int = 0,
+        batch_max_size: int = 100,
+        conflation_window_ms: int = 0,
+    ) -> None:
+        if manager is None:
+            logger.warning("[SocketioEmitter]::No message queue, emits are dropped")
+        self._manager = manager
+        self.batch_window = max(batch_window_ms, 0) / 1000
+        self.batch_max_size = max(batch_max_size, 1)
+        self.conflation_window = max(conflation_window_ms, 0) / 1000
+        self._batch: List[Dict] = []
+        self._batch_keys: Dict[Hashable, int] = {}
+        self._batch_lock = threading.Lock()
+        self._publish_lock = threading.Lock()
+        self._pending = threading.Event()
+        self._flusher: Optional[threading.Thread] = None
+
+    def emit(
+        self,
+        event: str,
+        data: Any,
+        *,
+        namespace: str,
+        room: Optional[str] = None,
+        key: Optional[Hashable] = None,
+    ) -> None:
+        """Emit `data`; with a batch or conflation window, a buffered emit with
+        the same `key` is replaced in place so only the latest value is published."""
+        if self._manager is None:
+            return
+        message = {
+            "method": "emit",
+            "event": event,
+            "data": data,
+            "namespace": namespace,
+            "room": room,
+            "skip_sid": None,
+            "callback": None,
+            "host_id": self._manager.host_id,
+        }
+        window = self.batch_window
+        if key is not None:
+            window = window or self.conflation_window
+        if not window:
+            return self._publish(message)
+
+        with self._batch_lock:
+            if key is not None and key in self._batch_keys:
+                self._batch[self._batch_keys[key]] = message
+                return
+            if key is not None:
+                self._batch_keys[key] = len(self._batch)
+            self._batch.append(message)
+            full = len(self._batch) >= self.batch_max_size
+            if self._flusher is None or not self._flusher.is_alive():
+                self._flusher = threading.Thread(
+                    target=self._run, name="socketio-emitter", daemon=True
+                )
+                self._flusher.start()
+        if full:
+            self.flush()
+        else:
+            self._pending.set()
+
+    def flush(self) -> None:
+        with self._batch_lock:
+            messages, self._batch = self._batch, []
+            self._batch_keys.clear()
+        if not messages:
+            return
+        if len(messages) == 1:
+            self._publish(messages[0])
+        else:
+            self._publish({"method": BATCH_METHOD, "messages": messages})
+
+    def close(self) -> None:
+        self.flush()
+
+    def _publish(self, data: Dict) -> None:
+        # Producers are not thread safe
+        with self._publish_lock:
+            self._manager._publish(data)
+
+    def _run(self) -> None:
+        while True:
+            self._pending.wait()
+            time.sleep(self.batch_window or self.conflation_window)
+            self._pending.clear()
+            try:
+                self.flush()
+            except Exception as e:
+                logger.error(f"[SocketioEmitter]::Flush error: {e!r}")
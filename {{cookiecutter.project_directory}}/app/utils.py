@@ -1,10 +1,21 @@
 import sys
+import json
+import time
+import base64
 import shortuuid
+from collections import OrderedDict
 from loguru import logger
 from datetime import datetime
+from typing import Any, Dict, Hashable, Optional, Union
+
+try:
+    import msgpack
+except ImportError:  # pragma: no cover
+    msgpack = None
 
 # Application
 from app.config import LogLevel
+from app.constants.encoding import MessageEncoding
 
 
 def logger_init(log_level: LogLevel = LogLevel.DEUBG) -> None:
@@ -29,3 +40,102 @@ def dt_to_string(dt: datetime):
 
 def get_shortuuid() -> str:
     return shortuuid.uuid()
+
+
+def encode_cursor(last_id: int) -> str:
+    return base64.urlsafe_b64encode(f"id:{last_id}".encode()).decode()
+
+
+def decode_cursor(cursor: str) -> int:
+    """Raise ValueError on a malformed cursor"""
+    try:
+        prefix, _, last_id = base64.urlsafe_b64decode(cursor.encode()).partition(b":")
+    except (TypeError, ValueError) as e:
+        raise ValueError(f"Invalid cursor: {cursor}") from e
+    if prefix != b"id" or not last_id.isdigit():
+        raise ValueError(f"Invalid cursor: {cursor}")
+    return int(last_id)
+
+
+def negotiate_encoding(requested: Optional[str]) -> MessageEncoding:
+    """Encoding asked by a client, JSON when unknown or not installed."""
+    try:
+        encoding = MessageEncoding(requested or MessageEncoding.JSON)
+    except ValueError:
+        return MessageEncoding.JSON
+    if encoding == MessageEncoding.MSGPACK and msgpack is None:
+        logger.warning("msgpack is not installed, fall back to JSON")
+        return MessageEncoding.JSON
+    return encoding
+
+
+def encode_message(payload: Any, encoding: MessageEncoding) -> Union[str, bytes]:
+    if encoding == MessageEncoding.MSGPACK:
+        return msgpack.packb(payload)
+    return payload if isinstance(payload, str) else json.dumps(payload)
+
+
+def encoded_room(room: str, encoding: MessageEncoding) -> str:
+    """Socket.IO room of the clients of `room` receiving `encoding`."""
+    if encoding == MessageEncoding.JSON:
+        return room
+    return f"{room}:{encoding.value}"
+
+
+class LRUCache:
+    """Bounded in-process LRU map with a per-entry time to live.
+
+    Not thread-safe, meant to be used from the event loop only.
+    """
+
+    __slots__ = ("_maxsize", "_ttl", "_data", "hits", "misses")
+
+    def __init__(self, maxsize: int = 1024, ttl: float = 60) -> None:
+        self._maxsize = maxsize
+        self._ttl = ttl
+        self._data: "OrderedDict[Hashable, Any]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        if (entry := self._data.get(key)) is None:
+            self.misses += 1
+            return None
+
+        value, expired_at = entry
+        if expired_at <= time.monotonic():
+            del self._data[key]
+            self.misses += 1
+            return None
+
+        self._data.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None) -> None:
+        ttl = self._ttl if ttl is None else min(ttl, self._ttl)
+        if ttl <= 0 or self._maxsize <= 0:
+            return
+
+        self._data[key] = (value, time.monotonic() + ttl)
+        self._data.move_to_end(key)
+        while len(self._data) > self._maxsize:
+            self._data.popitem(last=False)
+
+    def pop(self, key: Hashable) -> Optional[Any]:
+        entry = self._data.pop(key, None)
+        return entry[0] if entry is not None else None
+
+    def clear(self) -> None:
+        self._data.clear()
+
+    def info(self) -> Dict[str, int]:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "size": len(self._data),
+            "maxsize": self._maxsize,
+        }
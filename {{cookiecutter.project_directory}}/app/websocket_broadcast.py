@@ -0,0 +1,113 @@
+import asyncio
+import json
+import uuid
+import aioredis
+from abc import ABCMeta, abstractmethod
+from collections import defaultdict
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+from loguru import logger
+
+# (room, payload, key) of a message published by another process
+RemoteHandler = Callable[[str, Any, Optional[str]], Awaitable[None]]
+
+
+class WebsocketBroadcaster(metaclass=ABCMeta):
+    """Fan out raw websocket room messages to the other app processes.
+
+    The publishing process delivers to its own sockets directly, so a
+    broadcaster only hands each message to the other subscribers.
+    """
+
+    def __init__(self) -> None:
+        self.host_id = uuid.uuid4().hex
+        self._handler: Optional[RemoteHandler] = None
+
+    async def start(self, handler: RemoteHandler) -> None:
+        self._handler = handler
+
+    @abstractmethod
+    async def publish(self, room: str, payload: Any, key: Optional[str] = None) -> None:
+        ...
+
+    async def close(self) -> None:
+        self._handler = None
+
+    async def _handle(self, message: Dict) -> None:
+        if self._handler is None or message["host_id"] == self.host_id:
+            return
+        await self._handler(message["room"], message["data"], message.get("key"))
+
+
+class MemoryBroadcaster(WebsocketBroadcaster):
+    """In-process stand-in, instances on the same channel act as separate nodes."""
+
+    _subscribers: Dict[str, List["MemoryBroadcaster"]] = defaultdict(list)
+
+    def __init__(self, channel: str = "websocket") -> None:
+        super().__init__()
+        self.channel = channel
+
+    async def start(self, handler: RemoteHandler) -> None:
+        await super().start(handler)
+        self._subscribers[self.channel].append(self)
+
+    async def publish(self, room: str, payload: Any, key: Optional[str] = None) -> None:
+        message = {"host_id": self.host_id, "room": room, "data": payload, "key": key}
+        for subscriber in list(self._subscribers[self.channel]):
+            await subscriber._handle(message)
+
+    async def close(self) -> None:
+        if self in self._subscribers[self.channel]:
+            self._subscribers[self.channel].remove(self)
+        await super().close()
+
+
+class RedisBroadcaster(WebsocketBroadcaster):
+    """Redis pub/sub on one channel, every node receives every room message."""
+
+    def __init__(self, url: str, channel: str = "websocket") -> None:
+        super().__init__()
+        self.channel = channel
+        self._redis_client = aioredis.from_url(url)
+        self._reader: Optional[asyncio.Task] = None
+
+    async def start(self, handler: RemoteHandler) -> None:
+        await super().start(handler)
+        if self._reader is None:
+            self._reader = asyncio.create_task(self._listen())
+
+    async def publish(self, room: str, payload: Any, key: Optional[str] = None) -> None:
+        message = {"host_id": self.host_id, "room": room, "data": payload, "key": key}
+        try:
+            await self._redis_client.publish(self.channel, json.dumps(message))
+        except aioredis.exceptions.RedisError as e:
+            # Local sockets already got the message, other nodes miss this one
+            logger.error(f"[RedisBroadcaster]::Publish error: {e!r}")
+
+    async def close(self) -> None:
+        if self._reader is not None:
+            self._reader.cancel()
+            self._reader = None
+        await super().close()
+        await self._redis_client.close()
+
+    async def _listen(self) -> None:
+        retry_sleep = 1
+        while True:
+            try:
+                pubsub = self._redis_client.pubsub(ignore_subscribe_messages=True)
+                await pubsub.subscribe(self.channel)
+                retry_sleep = 1
+                async for message in pubsub.listen():
+                    if message["type"] != "message":
+                        continue
+                    try:
+                        await self._handle(json.loads(message["data"]))
+                    except Exception as e:
+                        logger.error(f"[RedisBroadcaster]::Handle error: {e!r}")
+            except aioredis.exceptions.RedisError:
+                logger.error(
+                    f"[RedisBroadcaster]::Receive error, retrying in {retry_sleep} secs"
+                )
+                await asyncio.sleep(retry_sleep)
+                retry_sleep = min(retry_sleep * 2, 60)
@@ -16,8 +16,10 @@ python ./app/initial/initial_data.py
 
 if [[ "${ENVIRONMENT}" == "PROD" ]]; then
     echo "Production Mode"
-    uvicorn app.main:app --host=0.0.0.0 --port=8000 --no-access-log
+    uvicorn app.main:app --host=0.0.0.0 --port=8000 --no-access-log \
+        --ws-per-message-deflate="${WS_PER_MESSAGE_DEFLATE:-true}"
 else
     echo "${ENVIRONMENT} Mode"
-    uvicorn app.main:app --host=0.0.0.0 --port=8000 --reload
+    uvicorn app.main:app --host=0.0.0.0 --port=8000 --reload \
+        --ws-per-message-deflate="${WS_PER_MESSAGE_DEFLATE:-true}"
 fi
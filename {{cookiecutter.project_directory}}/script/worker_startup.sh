@@ -16,7 +16,9 @@ python ./app/initial/initial_data.py
 
 if [[ "${ENVIRONMENT}" == "PROD" ]]; then
     echo "Production Mode"
-    celery -A app.main.celery worker --concurrency=1 --loglevel=error
+    # One pool per queue in production, see docker-compose-prod.yml
+    celery -A app.main.celery worker -Q "${CELERY_QUEUES:-p1,p2}" \
+        --concurrency="${CELERY_CONCURRENCY:-1}" --loglevel=error
 else
     echo "${ENVIRONMENT} Mode"
     python ./app/main.py
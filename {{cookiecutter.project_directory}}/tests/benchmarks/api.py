@@ -0,0 +1,203 @@
+"""HTTP API micro-benchmarks for the auth and user endpoints.
+
+Requests go through httpx `AsyncClient(app=...)`, without a server. The
+database is an in-memory SQLite and redis is fakeredis, so runs only
+depend on the machine. Reports requests (calls) per second and latency
+percentiles per endpoint and per service function.
+
+    python -m tests.benchmarks.api [--number 1000] [--users 1000]
+    python -m tests.benchmarks.api --save-baseline    # record the baseline
+    python -m tests.benchmarks.api --compare          # fail on regressions
+"""
+import argparse
+import asyncio
+import functools
+import os
+import sys
+import time
+from typing import Any, Awaitable, Callable, Dict, List
+from fakeredis import aioredis as fakeredis
+from fastapi.security import SecurityScopes
+from httpx import AsyncClient
+from dependency_injector import providers
+from tortoise import Tortoise
+
+# Application
+from app import create_app
+from app.db import get_tortoise_config
+from app.models import Role, User
+from app.services import BaseAuthService
+from app.constants import RoleEnum
+
+from tests.benchmarks.utils import compare, load_results, percentiles, write_results
+
+BASELINE = os.path.join(os.path.dirname(__file__), "baselines", "api.json")
+EMAIL = "benchmark@example.com"
+PASSWORD = "benchmark"
+
+
+async def setup_db(users: int) -> None:
+    await Tortoise.init(config=get_tortoise_config("sqlite://:memory:"))
+    await Tortoise.generate_schemas()
+
+    roles = {role: await Role.create(name=role.value) for role in RoleEnum}
+    # One bcrypt hash for everyone, hashing thousands would dominate the setup
+    password_hash = BaseAuthService.get_password_hash(PASSWORD)
+    await User.bulk_create(
+        User(
+            name=f"user{i}",
+            email=EMAIL if i == 0 else f"user{i}@example.com",
+            password_hash=password_hash,
+            is_active=True,
+        )
+        for i in range(users)
+    )
+    user = await User.get(email=EMAIL)
+    await user.roles.add(roles[RoleEnum.SUPER_ADMIN])
+
+
+async def measure(func: Callable[[], Awaitable[Any]], number: int) -> Dict:
+    for _ in range(min(number // 10, 100)):
+        await func()
+
+    latencies: List[float] = []
+    start = time.perf_counter()
+    for _ in range(number):
+        call_start = time.perf_counter()
+        await func()
+        latencies.append(time.perf_counter() - call_start)
+    total = time.perf_counter() - start
+
+    return {
+        "number": number,
+        "per_sec": round(number / total, 1),
+        "latency_ms": {
+            name: round(value * 1000, 3)
+            for name, value in percentiles(latencies, (50, 99)).items()
+        },
+    }
+
+
+def ok(res: Any) -> Any:
+    res.raise_for_status()
+    return res
+
+
+async def checked(request: Callable[[], Awaitable[Any]]) -> Any:
+    return ok(await request())
+
+
+async def run(args: Any) -> Dict:
+    app = create_app()
+    # Same client options as db.redis_init / db.result_redis_init
+    app.container.gateways.redis_client.override(
+        providers.Object(fakeredis.FakeRedis(encoding="utf-8", decode_responses=True))
+    )
+    app.container.gateways.result_redis_client.override(
+        providers.Object(fakeredis.FakeRedis())
+    )
+    await setup_db(args.users)
+
+    services = app.container.services
+    authentication_service = services.authentication_service()
+    authorization_service = services.authorization_service()
+    user_repo = services.user_repo()
+    user = await User.get(email=EMAIL)
+    # bcrypt dominates a login, a smaller sample gives the same percentiles
+    login_number = max(args.number // 50, 10)
+
+    async with AsyncClient(app=app, base_url="http://benchmark") as client:
+        login = {"username": EMAIL, "password": PASSWORD}
+        # Logging in also puts the user in the cache /users/me checks
+        res = ok(await client.post("/auth/login", data=login))
+        token = res.json()["access_token"]
+        headers = {"Authorization": f"Bearer {token}"}
+
+        endpoints = {
+            "POST /auth/login": (
+                lambda: client.post("/auth/login", data=login),
+                login_number,
+            ),
+            "GET /users/me": (
+                lambda: client.get("/users/me", headers=headers),
+                args.number,
+            ),
+            "GET /users": (
+                lambda: client.get("/users", params={"limit": 100}, headers=headers),
+                args.number,
+            ),
+        }
+        results: Dict[str, Dict] = {"endpoints": {}, "services": {}}
+        for name, (request, number) in endpoints.items():
+            results["endpoints"][name] = await measure(
+                functools.partial(checked, request), number
+            )
+
+    async def authenticate_jwt() -> Any:
+        # Served from the token cache after the first call, as in the app
+        return await authentication_service.authenticate_jwt(
+            SecurityScopes(), token=token
+        )
+
+    async def create_jwt_token() -> str:
+        return authorization_service.create_jwt_token(
+            user_id=user.id, scopes=[RoleEnum.SUPER_ADMIN.value]
+        )
+
+    async def get_by_id_with_role() -> Any:
+        return await user_repo.get_by_id_with_role(user.id)
+
+    service_calls = {
+        "AuthenticationService.authenticate_jwt": authenticate_jwt,
+        "AuthorizationService.create_jwt_token": create_jwt_token,
+        "UserRepo.get_by_id_with_role": get_by_id_with_role,
+    }
+    for name, call in service_calls.items():
+        results["services"][name] = await measure(call, args.number)
+
+    await Tortoise.close_connections()
+    return {"config": {"number": args.number, "users": args.users}, **results}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--number", type=int, default=1000)
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--output", help="Write the results as JSON")
+    parser.add_argument("--baseline", default=BASELINE)
+    parser.add_argument("--save-baseline", action="store_true")
+    parser.add_argument("--compare", action="store_true")
+    parser.add_argument("--tolerance", type=float, default=0.2)
+    args = parser.parse_args()
+
+    results = asyncio.run(run(args))
+
+    print(f"{'':<42}{'per sec':>10}{'p50 ms':>10}{'p99 ms':>10}")
+    for group in ("endpoints", "services"):
+        for name, row in results[group].items():
+            latency = row["latency_ms"]
+            print(
+                f"{name:<42}{row['per_sec']:>10}"
+                f"{latency['p50']:>10}{latency['p99']:>10}"
+            )
+
+    if args.output:
+        write_results(args.output, results)
+    if args.save_baseline:
+        os.makedirs(os.path.dirname(args.baseline), exist_ok=True)
+        write_results(args.baseline, results)
+        print(f"Baseline saved: {args.baseline}")
+    if args.compare:
+        if not os.path.exists(args.baseline):
+            sys.exit(f"No baseline at {args.baseline}, record one with --save-baseline")
+        regressions = compare(results, load_results(args.baseline), args.tolerance)
+        for regression in regressions:
+            print(f"Regression: {regression}")
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
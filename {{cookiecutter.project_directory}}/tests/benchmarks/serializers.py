@@ -0,0 +1,99 @@
+"""Compare Celery serializers: encode/decode throughput and stored result size.
+
+    python -m tests.benchmarks.serializers [--number 20000] [--output result.json]
+"""
+import argparse
+import json
+import time
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict
+from uuid import uuid4
+from kombu import serialization
+
+# Application
+from app.broker.serializers import MSGPACK_EXT, register_msgpack_ext
+
+SERIALIZERS = ["pickle", "json", MSGPACK_EXT]
+
+
+def task_message() -> Any:
+    # (args, kwargs, embed) body of a task message, protocol 2
+    args = [10, [{"id": i, "email": f"user{i}@example.com"} for i in range(50)]]
+    kwargs = {"requested_at": datetime.now(timezone.utc).isoformat()}
+    embed = {"callbacks": None, "errbacks": None, "chain": None, "chord": None}
+    return [args, kwargs, embed]
+
+
+def result_meta() -> Dict:
+    # What the redis result backend stores per task
+    return {
+        "status": "SUCCESS",
+        "result": {"detail": "health", "items": list(range(100))},
+        "traceback": None,
+        "children": [],
+        "date_done": datetime.now(timezone.utc).isoformat(),
+        "task_id": str(uuid4()),
+    }
+
+
+def ops_per_second(func: Callable[[], Any], number: int) -> float:
+    start = time.perf_counter()
+    for _ in range(number):
+        func()
+    return number / (time.perf_counter() - start)
+
+
+def bench(serializer: str, payload: Any, number: int) -> Dict:
+    content_type, content_encoding, data = serialization.dumps(
+        payload, serializer=serializer
+    )
+    accept = [content_type]
+    return {
+        "size": len(data),
+        "encode_ops": round(
+            ops_per_second(
+                lambda: serialization.dumps(payload, serializer=serializer), number
+            )
+        ),
+        "decode_ops": round(
+            ops_per_second(
+                lambda: serialization.loads(
+                    data, content_type, content_encoding, accept=accept
+                ),
+                number,
+            )
+        ),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--number", type=int, default=20000)
+    parser.add_argument("--output", help="Write the results as JSON")
+    args = parser.parse_args()
+
+    register_msgpack_ext()
+    results = {
+        name: {s: bench(s, payload, args.number) for s in SERIALIZERS}
+        for name, payload in (
+            ("task_message", task_message()),
+            ("result_meta", result_meta()),
+        )
+    }
+
+    for name, rows in results.items():
+        print(f"--- {name} ---")
+        print(f"{'serializer':<14}{'size (B)':>10}{'encode/s':>12}{'decode/s':>12}")
+        for serializer, row in rows.items():
+            print(
+                f"{serializer:<14}{row['size']:>10}"
+                f"{row['encode_ops']:>12}{row['decode_ops']:>12}"
+            )
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
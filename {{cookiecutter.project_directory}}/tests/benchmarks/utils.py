@@ -0,0 +1,65 @@
+import json
+import math
+from typing import Dict, Iterable, List, Optional, Sequence
+
+# Metrics compared against a baseline, by name part
+HIGHER_IS_BETTER = ("per_sec", "ratio")
+LOWER_IS_BETTER = ("_ms",)
+
+
+def percentiles(
+    values: Iterable[float], points: Sequence[int] = (50, 90, 99)
+) -> Dict[str, Optional[float]]:
+    """Nearest-rank percentiles plus the max, in the unit of `values`."""
+    ordered = sorted(values)
+    if not ordered:
+        return {**{f"p{p}": None for p in points}, "max": None}
+    result = {
+        f"p{p}": ordered[max(math.ceil(p / 100 * len(ordered)) - 1, 0)] for p in points
+    }
+    result["max"] = ordered[-1]
+    return result
+
+
+def flatten(results: Dict, prefix: str = "") -> Dict[str, float]:
+    flat = {}
+    for key, value in results.items():
+        name = f"{prefix}{key}"
+        if isinstance(value, dict):
+            flat.update(flatten(value, f"{name}."))
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            flat[name] = value
+    return flat
+
+
+def compare(results: Dict, baseline: Dict, tolerance: float) -> List[str]:
+    """Metrics of `results` worse than `baseline` by more than `tolerance`.
+
+    Throughput (`per_sec`) and delivery (`ratio`) metrics must not drop,
+    latencies (`_ms`) must not grow. Other values, like the run settings, and
+    metrics missing on either side are not compared.
+    """
+    current, previous = flatten(results), flatten(baseline)
+    regressions = []
+    for name, before in previous.items():
+        after = current.get(name)
+        if after is None or not before:
+            continue
+        change = (after - before) / before
+        if any(part in name for part in HIGHER_IS_BETTER):
+            change = -change
+        elif not any(part in name for part in LOWER_IS_BETTER):
+            continue
+        if change > tolerance:
+            regressions.append(f"{name}: {before} -> {after} ({change:+.0%} worse)")
+    return regressions
+
+
+def write_results(path: str, results: Dict) -> None:
+    with open(path, "w") as f:
+        json.dump(results, f, indent=2)
+
+
+def load_results(path: str) -> Dict:
+    with open(path) as f:
+        return json.load(f)
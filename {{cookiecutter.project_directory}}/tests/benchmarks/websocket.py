@@ -0,0 +1,343 @@
+"""Load raw websocket and Socket.IO clients on one task_info room.
+
+One sender posts timestamped messages to /ws/task_info/<room>, every other
+client is in the same room, raw websockets get the broadcast and Socket.IO
+clients the task_info emit. Measures the connect rate, emit-to-receive
+latency percentiles and delivered messages per second.
+
+    python -m tests.benchmarks.websocket --serve --websockets 1000 \\
+        --socketio 1000 --email <email> --password <password> --output ws.json
+
+`--serve` starts the app with the in-memory client manager, the database
+and cache still have to be reachable. Without it the app at `--url` is used.
+"""
+import argparse
+import asyncio
+import json
+import os
+import resource
+import subprocess
+import sys
+import time
+from typing import Any, Dict, List, Optional
+import httpx
+import websockets
+
+from tests.benchmarks.utils import compare, load_results, percentiles, write_results
+
+NAMESPACE = "/task"
+
+
+class Stats:
+    __slots__ = ("connect_times", "connect_errors", "latencies", "last_received")
+
+    def __init__(self) -> None:
+        self.connect_times: List[float] = []
+        self.connect_errors = 0
+        self.latencies: List[float] = []
+        self.last_received = 0.0
+
+    def receive(self, message: Any) -> None:
+        try:
+            sent_at = json.loads(message)["t"]
+        except (TypeError, ValueError, KeyError):
+            return
+        now = time.perf_counter()
+        self.latencies.append(now - sent_at)
+        self.last_received = now
+
+
+class SocketioClient:
+    """Minimal Socket.IO v5 client over a websocket, the task namespace only.
+
+    The python-socketio client needs aiohttp, this covers what the benchmark
+    uses: connect with auth, acknowledged emits, events and pings.
+    """
+
+    __slots__ = ("_url", "_websocket", "_handlers", "_acks", "_ack_id")
+
+    def __init__(self, url: str) -> None:
+        base = url.replace("http", "ws", 1).rstrip("/")
+        self._url = f"{base}/ws/socket.io/?EIO=4&transport=websocket"
+        self._websocket: Optional[websockets.WebSocketClientProtocol] = None
+        self._handlers: Dict[str, Any] = {}
+        self._acks: Dict[int, asyncio.Future] = {}
+        self._ack_id = 0
+
+    def on(self, event: str, handler: Any) -> None:
+        self._handlers[event] = handler
+
+    async def connect(self, auth: Dict) -> None:
+        self._websocket = await websockets.connect(self._url, max_queue=None)
+        open_packet = await self._websocket.recv()
+        if not open_packet.startswith("0"):
+            raise ConnectionError(f"Unexpected engine.io open packet: {open_packet}")
+
+        await self._websocket.send(f"40{NAMESPACE},{json.dumps(auth)}")
+        while True:
+            packet = await self._websocket.recv()
+            if packet == "2":
+                await self._websocket.send("3")
+            elif packet.startswith(f"40{NAMESPACE},"):
+                return
+            elif packet.startswith(f"44{NAMESPACE},"):
+                raise ConnectionRefusedError(packet)
+
+    async def call(self, event: str, data: Any) -> Any:
+        self._ack_id += 1
+        future = self._acks[self._ack_id] = asyncio.get_running_loop().create_future()
+        await self._websocket.send(
+            f"42{NAMESPACE},{self._ack_id}{json.dumps([event, data])}"
+        )
+        return await future
+
+    async def run(self) -> None:
+        prefix = len(NAMESPACE) + 3
+        try:
+            async for packet in self._websocket:
+                if packet == "2":
+                    await self._websocket.send("3")
+                elif packet.startswith(f"42{NAMESPACE},"):
+                    event, *args = json.loads(packet[prefix:])
+                    if (handler := self._handlers.get(event)) is not None:
+                        handler(*args)
+                elif packet.startswith(f"43{NAMESPACE},"):
+                    ack_id, _, body = packet[prefix:].partition("[")
+                    future = self._acks.pop(int(ack_id), None)
+                    if future is not None and not future.done():
+                        future.set_result(json.loads(f"[{body}"))
+        except websockets.WebSocketException:
+            pass
+
+    async def close(self) -> None:
+        if self._websocket is not None:
+            await self._websocket.close()
+
+
+async def connect_websocket(url: str, room: str, stats: Stats) -> Optional[Any]:
+    base = url.replace("http", "ws", 1).rstrip("/")
+    start = time.perf_counter()
+    try:
+        websocket = await websockets.connect(
+            f"{base}/ws/task_info/{room}", max_queue=None
+        )
+    except (OSError, websockets.WebSocketException):
+        stats.connect_errors += 1
+        return None
+    stats.connect_times.append(time.perf_counter() - start)
+    return websocket
+
+
+async def connect_socketio(
+    url: str, room: str, token: str, stats: Stats
+) -> Optional[SocketioClient]:
+    client = SocketioClient(url)
+    # task_info is emitted as (data, seq) when the replay buffer is on
+    client.on("task_info", lambda data, *seq: stats.receive(data))
+    start = time.perf_counter()
+    try:
+        await client.connect({"token": token})
+        asyncio.create_task(client.run())
+        await client.call("join_task_info_room", {"room_id": room})
+    except (OSError, ConnectionError, websockets.WebSocketException):
+        stats.connect_errors += 1
+        await client.close()
+        return None
+    stats.connect_times.append(time.perf_counter() - start)
+    return client
+
+
+async def read_websocket(websocket: Any, stats: Stats) -> None:
+    try:
+        async for message in websocket:
+            stats.receive(message)
+    except websockets.WebSocketException:
+        pass
+
+
+async def connect_all(connect: Any, count: int, concurrency: int) -> List[Any]:
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def limited() -> Any:
+        async with semaphore:
+            return await connect()
+
+    clients = await asyncio.gather(*(limited() for _ in range(count)))
+    return [client for client in clients if client is not None]
+
+
+def milliseconds(values: List[float]) -> Dict[str, Optional[float]]:
+    return {
+        name: None if value is None else round(value * 1000, 2)
+        for name, value in percentiles(values).items()
+    }
+
+
+def summarize(
+    stats: Stats, clients: int, connect_seconds: float, messages: int, started: float
+) -> Dict:
+    connected = len(stats.connect_times)
+    expected = connected * messages
+    delivered = len(stats.latencies)
+    duration = stats.last_received - started if delivered else 0
+    return {
+        "clients": clients,
+        "connected": connected,
+        "connect_errors": stats.connect_errors,
+        "connect_per_sec": (
+            round(connected / connect_seconds, 1) if connect_seconds else None
+        ),
+        "connect_ms": milliseconds(stats.connect_times),
+        "expected": expected,
+        "delivered": delivered,
+        "delivery_ratio": round(delivered / expected, 4) if expected else None,
+        "messages_per_sec": round(delivered / duration, 1) if duration else None,
+        "latency_ms": milliseconds(stats.latencies),
+    }
+
+
+async def login(url: str, email: str, password: str) -> str:
+    async with httpx.AsyncClient(base_url=url) as client:
+        res = await client.post(
+            "/auth/login", data={"username": email, "password": password}
+        )
+        res.raise_for_status()
+        return res.json()["access_token"]
+
+
+async def run(args: Any) -> Dict:
+    token = args.token
+    if args.socketio and token is None:
+        token = await login(args.url, args.email, args.password)
+
+    ws_stats, sio_stats = Stats(), Stats()
+    start = time.perf_counter()
+    ws_clients = await connect_all(
+        lambda: connect_websocket(args.url, args.room, ws_stats),
+        args.websockets,
+        args.connect_concurrency,
+    )
+    ws_connect_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    socketio_clients = await connect_all(
+        lambda: connect_socketio(args.url, args.room, token, sio_stats),
+        args.socketio,
+        args.connect_concurrency,
+    )
+    sio_connect_seconds = time.perf_counter() - start
+
+    readers = [asyncio.create_task(read_websocket(ws, ws_stats)) for ws in ws_clients]
+
+    # The sender is excluded from its own broadcast, its replies are "ok"
+    sender = await connect_websocket(args.url, args.room, Stats())
+    sender_reader = asyncio.create_task(read_websocket(sender, Stats()))
+    started = time.perf_counter()
+    for i in range(args.messages):
+        await sender.send(json.dumps({"i": i, "t": time.perf_counter()}))
+        await asyncio.sleep(1 / args.rate)
+    await asyncio.sleep(args.drain)
+
+    await sender.close()
+    for websocket in ws_clients:
+        await websocket.close()
+    for client in socketio_clients:
+        await client.close()
+    for task in (*readers, sender_reader):
+        task.cancel()
+
+    return {
+        "config": {
+            "messages": args.messages,
+            "rate": args.rate,
+            "connect_concurrency": args.connect_concurrency,
+        },
+        "websocket": summarize(
+            ws_stats, args.websockets, ws_connect_seconds, args.messages, started
+        ),
+        "socketio": summarize(
+            sio_stats, args.socketio, sio_connect_seconds, args.messages, started
+        ),
+    }
+
+
+def serve(url: str) -> subprocess.Popen:
+    port = httpx.URL(url).port or 8000
+    env = {**os.environ, "SOCKETIO_MANAGER": "memory", "WEBSOCKET_BROADCAST": "memory"}
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port)],
+        env=env,
+    )
+    for _ in range(100):
+        try:
+            if httpx.get(f"{url}/health").status_code == 200:
+                return process
+        except httpx.TransportError:
+            pass
+        time.sleep(0.2)
+    process.terminate()
+    raise RuntimeError("The app did not start")
+
+
+def raise_open_files_limit() -> None:
+    # Every client is a socket, thousands need more than the usual 1024
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    if soft < hard:
+        resource.setrlimit(resource.RLIMIT_NOFILE, (hard, hard))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--url", default="http://localhost:8000")
+    parser.add_argument("--serve", action="store_true", help="Start the app")
+    parser.add_argument("--room", default="benchmark")
+    parser.add_argument("--websockets", type=int, default=1000)
+    parser.add_argument("--socketio", type=int, default=1000)
+    parser.add_argument("--connect-concurrency", type=int, default=200)
+    parser.add_argument("--messages", type=int, default=200)
+    parser.add_argument("--rate", type=float, default=50, help="Messages per second")
+    parser.add_argument("--drain", type=float, default=2, help="Wait after the last")
+    parser.add_argument("--token", help="JWT for the Socket.IO clients")
+    parser.add_argument("--email", help="Login for the Socket.IO clients")
+    parser.add_argument("--password")
+    parser.add_argument("--output", help="Write the results as JSON")
+    parser.add_argument("--baseline", help="Fail on regressions against this JSON")
+    parser.add_argument("--tolerance", type=float, default=0.2)
+    args = parser.parse_args()
+    if args.socketio and not (args.token or (args.email and args.password)):
+        parser.error("Socket.IO clients need --token or --email and --password")
+
+    raise_open_files_limit()
+    process = serve(args.url) if args.serve else None
+    try:
+        results = asyncio.run(run(args))
+    finally:
+        if process is not None:
+            process.terminate()
+            process.wait()
+
+    print(f"{'':<10}{'connected':>10}{'conn/s':>10}{'msg/s':>10}", end="")
+    print(f"{'p50 ms':>10}{'p99 ms':>10}{'delivered':>12}")
+    for transport in ("websocket", "socketio"):
+        row = results[transport]
+        print(
+            f"{transport:<10}{row['connected']:>10}{str(row['connect_per_sec']):>10}"
+            f"{str(row['messages_per_sec']):>10}"
+            f"{str(row['latency_ms']['p50']):>10}{str(row['latency_ms']['p99']):>10}"
+            f"{str(row['delivery_ratio']):>12}"
+        )
+
+    if args.output:
+        write_results(args.output, results)
+    if args.baseline:
+        regressions = compare(results, load_results(args.baseline), args.tolerance)
+        for regression in regressions:
+            print(f"Regression: {regression}")
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,7 @@
 import pytest
 
 # Application
-from app import models
+from app import models, repositories
 from app.constants import RoleEnum
 
 # Tests
@@ -24,3 +24,19 @@ async def test_get_users_in_db():
         fake_user: test_utils.FakeUser = func()
         get_user = await models.User.get(name=fake_user.name)
         assert get_user.email == fake_user.email, f"Get {user} failed"
+
+
+@pytest.mark.run(order=3)
+@pytest.mark.asyncio
+async def test_get_user_by_mail_with_role_names():
+    user_repo = repositories.UserRepo()
+    users = test_utils.FAKE_USERS
+    for user, func in users.items():
+        fake_user: test_utils.FakeUser = func()
+        get_user = await user_repo.get_by_mail_with_role_names(fake_user.email)
+        assert get_user["name"] == fake_user.name, f"Get {user} failed"
+        assert sorted(get_user["roles"]) == sorted(
+            role.value for role in fake_user.role
+        )
+
+    assert await user_repo.get_by_mail_with_role_names("nobody@gmail.com") is None
@@ -0,0 +1,36 @@
+import pytest
+from httpx import AsyncClient
+from unittest import mock
+
+# Application
+from app.constants import TaskPriority
+
+ENDPOINT = "/events/long-trip"
+
+
+@pytest.mark.events
+@pytest.mark.asyncio
+@pytest.mark.parametrize("priority", [None, TaskPriority.HIGH, TaskPriority.LOW])
+async def test_long_trip_priority(client: AsyncClient, priority):
+    params = {"t": 10}
+    if priority:
+        params["priority"] = priority.value
+
+    with mock.patch(
+        "app.broker.task_pipelines.long_trip",
+        new_callable=mock.AsyncMock,
+        return_value="task-id",
+    ) as long_trip:
+        res = await client.post(ENDPOINT, params=params)
+
+    assert res.status_code == 200, f"Error status code: {res.status_code}"
+    assert res.json() == {"task_id": "task-id"}
+    long_trip.assert_awaited_once_with(mock.ANY, 10, priority=priority)
+
+
+@pytest.mark.events
+@pytest.mark.asyncio
+async def test_long_trip_422_invalid_priority(client: AsyncClient):
+    res = await client.post(ENDPOINT, params={"t": 10, "priority": "urgent"})
+
+    assert res.status_code == 422, f"Error status code: {res.status_code}"
@@ -0,0 +1,43 @@
+import pytest
+from httpx import AsyncClient
+from unittest import mock
+
+# Application
+from app import repositories
+from app.broker import TaskPublisher
+
+ENDPOINT = "/events/long-trip/batch"
+
+
+@pytest.mark.events
+@pytest.mark.asyncio
+async def test_long_trip_batch(client: AsyncClient, app):
+    task_publisher_mock = mock.AsyncMock(spec=TaskPublisher)
+    task_group_cache_mock = mock.AsyncMock(spec=repositories.TaskGroupCache)
+    body = {"tasks": [{"t": 10}, {"t": 12, "priority": "high"}, {"t": 20}]}
+
+    with app.container.services.task_publisher.override(
+        task_publisher_mock
+    ), app.container.services.task_group_cache.override(task_group_cache_mock):
+        res = await client.post(ENDPOINT, json=body)
+
+    assert res.status_code == 200, f"Error status code: {res.status_code}"
+    data = res.json()
+    assert len(set(data["task_ids"])) == 3, f"Unexpected task IDs: {data}"
+
+    # The counters exist before the group is published
+    task_group_cache_mock.create.assert_awaited_once_with(data["group_id"], 3)
+    signatures = task_publisher_mock.apply_many.await_args.args[0]
+    assert [s.id for s in signatures] == data["task_ids"], f"Unexpected: {signatures}"
+
+
+@pytest.mark.events
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "body",
+    [{"tasks": []}, {"tasks": [{"t": 10}] * 101}, {"tasks": [{"t": 5}]}],
+)
+async def test_long_trip_batch_422(client: AsyncClient, body):
+    res = await client.post(ENDPOINT, json=body)
+
+    assert res.status_code == 422, f"Error status code: {res.status_code}"
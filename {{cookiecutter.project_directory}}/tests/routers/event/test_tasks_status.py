@@ -0,0 +1,41 @@
+import pytest
+from httpx import AsyncClient
+from unittest import mock
+
+# Application
+from app import repositories
+
+ENDPOINT = "/events/status"
+
+
+@pytest.mark.events
+@pytest.mark.asyncio
+async def test_get_tasks_status(client: AsyncClient, app):
+    task_result_cache_mock = mock.AsyncMock(spec=repositories.TaskResultCache)
+    task_result_cache_mock.get_many.return_value = [
+        {"status": "SUCCESS", "result": None},
+        {"status": "FAILURE", "result": ValueError("boom")},
+        None,
+    ]
+
+    with app.container.services.task_result_cache.override(task_result_cache_mock):
+        res = await client.get(ENDPOINT, params={"ids": ["a,b", "c", "a"]})
+
+    assert res.status_code == 200, f"Error status code: {res.status_code}, Expected 200"
+
+    assert res.json() == [
+        {"task_id": "a", "state": "SUCCESS", "error": None, "progress": None},
+        {"task_id": "b", "state": "FAILURE", "error": "boom", "progress": None},
+        {"task_id": "c", "state": "PENDING", "error": None, "progress": None},
+    ], f"Unexpected response: {res.json()}"
+
+    task_result_cache_mock.get_many.assert_called_once_with(["a", "b", "c"])
+
+
+@pytest.mark.events
+@pytest.mark.asyncio
+async def test_get_tasks_status_400_too_many_ids(client: AsyncClient):
+    ids = ",".join(str(i) for i in range(501))
+    res = await client.get(ENDPOINT, params={"ids": ids})
+
+    assert res.status_code == 400, f"Error status code: {res.status_code}, Expected 400"
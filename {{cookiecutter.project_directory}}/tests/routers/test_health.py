@@ -1,4 +1,9 @@
+import asyncio
 import pytest
+from unittest import mock
+
+# Application
+from app.socketio_managers import BoundedAsyncServer
 
 ENDPOINT = "/health"
 
@@ -10,3 +15,48 @@ async def test_health_check(client):
     assert res.status_code == 200, f"Invalid status code: {res.status_code}"
 
     assert res.json() == {"detail": "health"}
+
+
+@pytest.mark.health
+@pytest.mark.asyncio
+async def test_websocket_send_queue_check(client):
+    res = await client.get(f"{ENDPOINT}/ws")
+    assert res.status_code == 200, f"Invalid status code: {res.status_code}"
+
+    data = res.json()
+    assert {"connections", "queued", "max_depth", "dropped"} <= set(
+        data["websocket"]
+    ), f"Unexpected response: {data}"
+
+
+@pytest.mark.health
+@pytest.mark.asyncio
+async def test_websocket_send_queue_check_slow_socketio_client(app, client):
+    # The server is created on startup, the test client does not run it
+    server = app.socketio_server = BoundedAsyncServer(
+        async_mode="asgi", max_send_queue=1
+    )
+    socket = mock.Mock(queue=asyncio.Queue())
+    socket.queue.put_nowait("queued")
+    server.eio.sockets["slow"] = socket
+
+    # The client is one packet behind, the emit is dropped
+    await server._emit_internal("slow", "task_info", "data", namespace="/task")
+
+    res = await client.get(f"{ENDPOINT}/ws")
+    assert res.status_code == 200, f"Invalid status code: {res.status_code}"
+    stats = res.json()["socketio"]
+    assert stats["connections"] == 1 and stats["max_depth"] == 1, f"Unexpected: {stats}"
+    assert stats["dropped"] == 1, f"Unexpected: {stats}"
+
+
+@pytest.mark.health
+@pytest.mark.asyncio
+async def test_password_hasher_check(client):
+    res = await client.get(f"{ENDPOINT}/auth")
+    assert res.status_code == 200, f"Invalid status code: {res.status_code}"
+
+    data = res.json()
+    assert {"pending", "queued", "completed", "failed", "rejected"} <= set(
+        data["password_hasher"]
+    ), f"Unexpected response: {data}"
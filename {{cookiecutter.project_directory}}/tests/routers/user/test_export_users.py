@@ -0,0 +1,49 @@
+import csv
+import json
+import pytest
+
+# Application
+from app.security import get_current_user_in_cache
+from app.schemas import UserSchema
+
+# Testing
+from tests import test_utils
+
+ENDPOINT = "/users/export"
+
+
+@pytest.mark.users
+@pytest.mark.asyncio
+async def test_export_users_csv(client, app):
+    app.dependency_overrides[
+        get_current_user_in_cache
+    ] = test_utils.override_get_current_user_in_cache_user_super
+    res = await client.get(ENDPOINT, params={"format": "csv"})
+    assert res.status_code == 200, f"Error status code: {res.status_code}"
+    assert res.headers["content-type"].startswith("text/csv")
+
+    rows = list(csv.DictReader(res.text.splitlines()))
+    emails = {row["email"] for row in rows}
+    for func in test_utils.FAKE_USERS.values():
+        assert func().email in emails, f"Missing user: {func().email}"
+
+
+@pytest.mark.users
+@pytest.mark.asyncio
+async def test_export_users_ndjson(client, app):
+    app.dependency_overrides[
+        get_current_user_in_cache
+    ] = test_utils.override_get_current_user_in_cache_user_super
+    res = await client.get(ENDPOINT, params={"format": "ndjson"})
+    assert res.status_code == 200, f"Error status code: {res.status_code}"
+
+    for line in res.text.splitlines():
+        UserSchema.UserInDB(**json.loads(line))
+
+
+@pytest.mark.users
+@pytest.mark.asyncio
+async def test_export_users_401_authentication_error(client, app):
+    app.dependency_overrides = {}
+    res = await client.get(ENDPOINT)
+    assert res.status_code == 401, f"Error status code: {res.status_code}"
@@ -1,3 +1,4 @@
+import json
 import pytest
 
 # Application
@@ -27,6 +28,47 @@ async def test_get_all_users(client, app):
         UserSchema.UserInfo(**user)
 
 
+@pytest.mark.users
+@pytest.mark.asyncio
+async def test_get_all_users_with_cursor(client, app):
+    app.dependency_overrides[
+        get_current_user_in_cache
+    ] = test_utils.override_get_current_user_in_cache_user_super
+    res = await client.get(ENDPOINT, params={"limit": 1})
+    assert res.status_code == 200, f"Error status code: {res.status_code}"
+    assert len(res.json()) == 1, f"Unexpected response: {res.json()}"
+
+    cursor = res.headers["X-Next-Cursor"]
+    next_res = await client.get(ENDPOINT, params={"limit": 1, "cursor": cursor})
+    assert next_res.status_code == 200, f"Error status code: {next_res.status_code}"
+    assert next_res.json() != res.json(), "Cursor did not move forward"
+
+
+@pytest.mark.users
+@pytest.mark.asyncio
+async def test_get_all_users_stream(client, app):
+    app.dependency_overrides[
+        get_current_user_in_cache
+    ] = test_utils.override_get_current_user_in_cache_user_super
+    res = await client.get(ENDPOINT, params={"stream": True})
+    assert res.status_code == 200, f"Error status code: {res.status_code}"
+
+    lines = res.text.splitlines()
+    assert lines, "Empty stream"
+    for line in lines:
+        UserSchema.UserInfo(**json.loads(line))
+
+
+@pytest.mark.users
+@pytest.mark.asyncio
+async def test_get_all_users_400_invalid_cursor(client, app):
+    app.dependency_overrides[
+        get_current_user_in_cache
+    ] = test_utils.override_get_current_user_in_cache_user_super
+    res = await client.get(ENDPOINT, params={"cursor": "not-a-cursor"})
+    assert res.status_code == 400, f"Error status code: {res.status_code}"
+
+
 @pytest.mark.users
 @pytest.mark.asyncio
 async def test_get_all_users_401_authentication_error(client, app):
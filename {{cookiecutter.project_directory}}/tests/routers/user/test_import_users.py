@@ -0,0 +1,51 @@
+import pytest
+
+# Application
+from app import models
+from app.security import get_current_user_in_cache
+from app.schemas import UserSchema
+from app.constants import RoleEnum
+
+# Testing
+from tests import test_utils
+
+ENDPOINT = "/users/import"
+
+
+def create_payload(email: str) -> dict:
+    name = email.split("@")[0]
+    return UserSchema.UserCreate(
+        email=email, name=name, password=name, verify_password=name
+    ).dict()
+
+
+@pytest.mark.users
+@pytest.mark.asyncio
+async def test_import_users(client, app):
+    app.dependency_overrides[
+        get_current_user_in_cache
+    ] = test_utils.override_get_current_user_in_cache_user_super
+    payload = [
+        create_payload("import1@gmail.com"),
+        create_payload("import2@gmail.com"),
+        create_payload("import1@gmail.com"),
+        create_payload(test_utils.fake_guest_user().email),
+    ]
+    res = await client.post(ENDPOINT, json=payload)
+    assert res.status_code == 200, f"Error status code: {res.status_code}"
+
+    response = UserSchema.UserImportResponse(**res.json())
+    assert response.created == 2, f"Unexpected response: {res.json()}"
+    assert [conflict.index for conflict in response.conflicts] == [2, 3]
+
+    user = await models.User.get(email="import1@gmail.com").prefetch_related("roles")
+    assert not user.is_active
+    assert [role.name for role in user.roles] == [RoleEnum.GUEST]
+
+
+@pytest.mark.users
+@pytest.mark.asyncio
+async def test_import_users_401_authentication_error(client, app):
+    app.dependency_overrides = {}
+    res = await client.post(ENDPOINT, json=[create_payload("import3@gmail.com")])
+    assert res.status_code == 401, f"Error status code: {res.status_code}"
@@ -0,0 +1,101 @@
+import pytest
+from unittest import mock
+from fastapi import WebSocket
+
+# Application
+from app import services
+from app.routers import TaskSocketIONamespace
+from app.constants import MessageEncoding
+
+
+def create_websocket_mock() -> mock.AsyncMock:
+    return mock.AsyncMock(spec=WebSocket)
+
+
+@pytest.mark.websocket
+@pytest.mark.asyncio
+async def test_broadcast_to_room():
+    manager = services.TaskWebsocketManager()
+    sender, peer, other = (create_websocket_mock() for _ in range(3))
+
+    await manager.connect(sender, room="20")
+    await manager.connect(peer, room="20")
+    await manager.connect(other, room="21")
+
+    sent = await manager.broadcast("20", {"state": "SUCCESS"}, exclude=sender)
+    await manager.drain()
+
+    assert sent == 1, f"Unexpected sent count: {sent}"
+    peer.send_text.assert_called_once_with('{"state": "SUCCESS"}')
+    sender.send_text.assert_not_called()
+    other.send_text.assert_not_called()
+
+
+@pytest.mark.websocket
+@pytest.mark.asyncio
+async def test_broadcast_drop_failed_socket():
+    manager = services.TaskWebsocketManager()
+    healthy, broken = create_websocket_mock(), create_websocket_mock()
+    broken.send_text.side_effect = RuntimeError("closed")
+
+    await manager.connect(healthy, room="20")
+    await manager.connect(broken, room="20")
+
+    # Sends are queued, the broken socket is dropped by its writer
+    sent = await manager.broadcast("20", "hello")
+    await manager.drain()
+
+    assert sent == 2, f"Unexpected sent count: {sent}"
+    assert manager.registry.count("20") == 1
+    assert manager.send_queue_stats()["connections"] == 1
+
+
+@pytest.mark.websocket
+@pytest.mark.asyncio
+async def test_disconnect_leave_all_rooms():
+    manager = services.TaskWebsocketManager()
+    websocket = create_websocket_mock()
+
+    await manager.connect(websocket, room="20")
+    manager.registry.join("21", websocket)
+    await manager.disconnect(websocket)
+
+    assert manager.registry.count("20") == 0
+    assert manager.registry.count("21") == 0
+    assert await manager.broadcast("20", "hello") == 0
+
+
+@pytest.mark.websocket
+@pytest.mark.asyncio
+async def test_broadcast_per_encoding():
+    msgpack = pytest.importorskip("msgpack")
+    manager = services.TaskWebsocketManager()
+    json_client, msgpack_client = create_websocket_mock(), create_websocket_mock()
+
+    await manager.connect(json_client, room="20")
+    await manager.connect(msgpack_client, room="20", encoding=MessageEncoding.MSGPACK)
+
+    await manager.broadcast("20", {"state": "SUCCESS"})
+    await manager.drain()
+
+    json_client.send_text.assert_called_once_with('{"state": "SUCCESS"}')
+    msgpack_client.send_bytes.assert_called_once_with(
+        msgpack.packb({"state": "SUCCESS"})
+    )
+
+
+@pytest.mark.websocket
+@pytest.mark.asyncio
+@pytest.mark.parametrize("last_seq", ["abc", [1], {}])
+async def test_join_task_info_room_invalid_last_seq(last_seq):
+    namespace = TaskSocketIONamespace("/task")
+    manager = mock.AsyncMock(spec=services.TaskSocketioManager)
+
+    res = await namespace.on_join_task_info_room(
+        "sid",
+        {"room_id": "20", "last_seq": last_seq},
+        task_socketio_manager=manager,
+    )
+
+    assert res == ("invalid last_seq", 400), f"Unexpected ack: {res}"
+    manager.enter_room.assert_not_awaited()
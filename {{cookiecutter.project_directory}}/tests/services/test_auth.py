@@ -0,0 +1,111 @@
+import asyncio
+import pytest
+import threading
+import time
+from fastapi import HTTPException
+from fastapi.security import SecurityScopes
+
+# Application
+from app.constants import RoleEnum
+from app.services import PasswordHasher
+
+
+@pytest.mark.services
+@pytest.mark.asyncio
+async def test_authenticate_jwt_cache(app):
+    authentication_service = app.container.services.authentication_service()
+    authorization_service = app.container.services.authorization_service()
+    token = authorization_service.create_jwt_token(
+        user_id=1, scopes=[RoleEnum.ADMIN.value]
+    )
+
+    first = await authentication_service.authenticate_jwt(SecurityScopes(), token)
+    second = await authentication_service.authenticate_jwt(
+        SecurityScopes(scopes=[RoleEnum.ADMIN.value]), token
+    )
+
+    assert first.id == second.id == 1
+    info = authentication_service.token_cache_info()
+    assert info["misses"] == 1 and info["hits"] == 1, f"Unexpected info: {info}"
+
+
+@pytest.mark.services
+@pytest.mark.asyncio
+async def test_authenticate_jwt_cache_check_scopes(app):
+    authentication_service = app.container.services.authentication_service()
+    authorization_service = app.container.services.authorization_service()
+    token = authorization_service.create_jwt_token(
+        user_id=1, scopes=[RoleEnum.GUEST.value]
+    )
+
+    await authentication_service.authenticate_jwt(SecurityScopes(), token)
+
+    # Cached tokens still go through the scope check
+    with pytest.raises(HTTPException) as e:
+        await authentication_service.authenticate_jwt(
+            SecurityScopes(scopes=[RoleEnum.SUPER_ADMIN.value]), token
+        )
+    assert e.value.status_code == 403
+
+
+@pytest.mark.services
+@pytest.mark.asyncio
+async def test_password_hasher_hash_many_bounded(monkeypatch):
+    lock = threading.Lock()
+    running = peak = 0
+
+    def hash_all(passwords):
+        nonlocal running, peak
+        with lock:
+            running += 1
+            peak = max(peak, running)
+        time.sleep(0.01)
+        with lock:
+            running -= 1
+        return [f"hash-{password}" for password in passwords]
+
+    monkeypatch.setattr(PasswordHasher, "_hash_all", staticmethod(hash_all))
+    hasher = PasswordHasher(max_workers=3, max_queue=0)
+    passwords = [str(i) for i in range(20)]
+
+    hashes = await hasher.hash_many(passwords, chunk_size=2)
+
+    assert hashes == [f"hash-{password}" for password in passwords]
+    # One worker stays free for logins
+    assert peak == 2, f"Unexpected chunks in flight: {peak}"
+    assert hasher.stats()["pending"] == 0
+    assert hasher.stats()["completed"] == len(passwords)
+    hasher.shutdown()
+
+
+@pytest.mark.services
+@pytest.mark.asyncio
+async def test_password_hasher_reject_when_queue_full():
+    hasher = PasswordHasher(max_workers=1, max_queue=0)
+    release = threading.Event()
+    running = asyncio.ensure_future(hasher._run(release.wait))
+    await asyncio.sleep(0.01)
+
+    with pytest.raises(HTTPException) as e:
+        await hasher.hash("password")
+    assert e.value.status_code == 503
+
+    release.set()
+    await running
+    stats = hasher.stats()
+    assert (stats["completed"], stats["rejected"]) == (1, 1), f"Unexpected: {stats}"
+    hasher.shutdown()
+
+
+@pytest.mark.services
+@pytest.mark.asyncio
+async def test_password_hasher_failure_not_completed():
+    hasher = PasswordHasher(max_workers=1)
+
+    with pytest.raises(ValueError):
+        await hasher.verify("password", "not a bcrypt hash")
+
+    stats = hasher.stats()
+    assert stats["completed"] == 0 and stats["failed"] == 1, f"Unexpected: {stats}"
+    assert stats["pending"] == 0
+    hasher.shutdown()
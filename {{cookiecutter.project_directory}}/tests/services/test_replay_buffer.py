@@ -0,0 +1,68 @@
+import pytest
+from unittest import mock
+
+# Application
+from app import repositories
+
+
+@pytest.mark.services
+@pytest.mark.asyncio
+async def test_memory_replay_buffer_since():
+    buffer = repositories.MemoryReplayBuffer(size=3)
+
+    seqs = [await buffer.append("20", {"i": i}) for i in range(5)]
+    await buffer.append("21", {"i": 0})
+
+    assert seqs == [1, 2, 3, 4, 5], f"Unexpected sequence numbers: {seqs}"
+    # Only the last 3 messages are kept
+    assert await buffer.since("20", 0) == [(3, {"i": 2}), (4, {"i": 3}), (5, {"i": 4})]
+    assert await buffer.since("20", 4) == [(5, {"i": 4})]
+    assert await buffer.since("20", 5) == []
+    assert await buffer.since("22", 0) == []
+
+
+@pytest.mark.services
+@pytest.mark.asyncio
+async def test_memory_replay_buffer_evict_oldest_room():
+    buffer = repositories.MemoryReplayBuffer(size=3, max_rooms=2)
+
+    await buffer.append("20", "a")
+    await buffer.append("21", "b")
+    await buffer.append("20", "c")
+    await buffer.append("22", "d")
+
+    assert (
+        await buffer.since("21", 0) == []
+    ), "Least recently written room was not evicted"
+    assert await buffer.since("20", 0) == [(1, "a"), (2, "c")]
+
+
+@pytest.mark.services
+@pytest.mark.asyncio
+async def test_memory_replay_buffer_keep_seq_of_evicted_room():
+    buffer = repositories.MemoryReplayBuffer(size=3, max_rooms=1)
+
+    await buffer.append("20", "a")
+    await buffer.append("21", "b")
+    assert await buffer.since("20", 0) == [], "Room was not evicted"
+
+    # The client saw seq 1 before the eviction, the new message is above it
+    assert await buffer.append("20", "c") == 2
+    assert await buffer.since("20", 1) == [(2, "c")]
+
+
+@pytest.mark.services
+@pytest.mark.asyncio
+async def test_redis_replay_buffer_seq_outlive_stream():
+    redis_client = mock.MagicMock()
+    append = redis_client.register_script.return_value = mock.AsyncMock(return_value=1)
+    buffer = repositories.RedisReplayBuffer(redis_client, expired_time_seconds=60)
+
+    assert await buffer.append("20", "a") == 1
+
+    # A counter expiring with the stream would restart the room at seq 1
+    _, _, stream_ttl, seq_ttl = append.await_args.kwargs["args"]
+    assert append.await_args.kwargs["keys"] == ["replay:20", "replay:20:seq"]
+    assert (
+        stream_ttl == 60 and seq_ttl > 60
+    ), f"Unexpected TTLs: {stream_ttl}, {seq_ttl}"
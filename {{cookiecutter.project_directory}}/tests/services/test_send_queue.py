@@ -0,0 +1,84 @@
+import asyncio
+import pytest
+from unittest import mock
+from fastapi import WebSocket
+
+# Application
+from app import services
+from app.constants import SendQueuePolicy
+
+
+def create_blocked_websocket_mock() -> mock.AsyncMock:
+    """Websocket whose sends hang until `release` is set."""
+    websocket = mock.AsyncMock(spec=WebSocket)
+    websocket.release = asyncio.Event()
+
+    async def send_text(message):
+        await websocket.release.wait()
+
+    websocket.send_text.side_effect = send_text
+    return websocket
+
+
+async def connect_blocked(manager, room: str) -> mock.AsyncMock:
+    websocket = create_blocked_websocket_mock()
+    await manager.connect(websocket, room=room)
+    # Let the writer take the first message and block on it
+    await manager.broadcast(room, "first")
+    await asyncio.sleep(0)
+    return websocket
+
+
+@pytest.mark.services
+@pytest.mark.asyncio
+async def test_send_queue_drop_oldest():
+    manager = services.TaskWebsocketManager(
+        send_queue_size=2, send_queue_policy=SendQueuePolicy.DROP_OLDEST
+    )
+    websocket = await connect_blocked(manager, "20")
+
+    for i in range(5):
+        await manager.broadcast("20", str(i))
+
+    stats = manager.send_queue_stats()
+    assert stats["queued"] == 2 and stats["dropped"] == 3, f"Unexpected: {stats}"
+
+    websocket.release.set()
+    await manager.drain()
+    sent = [c.args[0] for c in websocket.send_text.call_args_list]
+    assert sent == ["first", "3", "4"], f"Unexpected sent: {sent}"
+
+
+@pytest.mark.services
+@pytest.mark.asyncio
+async def test_send_queue_coalesce_latest_per_key():
+    manager = services.TaskWebsocketManager(
+        send_queue_size=10, send_queue_policy=SendQueuePolicy.COALESCE
+    )
+    websocket = await connect_blocked(manager, "20")
+
+    await manager.broadcast("20", {"state": "STARTED"}, key="task")
+    await manager.broadcast("20", "chat")
+    await manager.broadcast("20", {"state": "SUCCESS"}, key="task")
+
+    websocket.release.set()
+    await manager.drain()
+    sent = [c.args[0] for c in websocket.send_text.call_args_list]
+    assert sent == ["first", '{"state": "SUCCESS"}', "chat"], f"Unexpected: {sent}"
+
+
+@pytest.mark.services
+@pytest.mark.asyncio
+async def test_send_queue_disconnect_slow_consumer():
+    manager = services.TaskWebsocketManager(
+        send_queue_size=1, send_queue_policy=SendQueuePolicy.DISCONNECT
+    )
+    websocket = await connect_blocked(manager, "20")
+
+    assert await manager.broadcast("20", "queued") == 1
+    assert await manager.broadcast("20", "overflow") == 0
+    await asyncio.sleep(0)
+
+    websocket.close.assert_called_once_with(code=1013)
+    assert manager.registry.count("20") == 0
+    assert manager.send_queue_stats()["disconnected"] == 1
@@ -0,0 +1,274 @@
+import asyncio
+import pickle
+import time
+import pytest
+from typing import List
+from unittest import mock
+from socketio.asyncio_pubsub_manager import AsyncPubSubManager
+
+# Application
+from app.socketio_managers import (
+    BatchingPubSubMixin,
+    BoundedAsyncServer,
+    RoomRoutingRedisManager,
+    SocketioEmitter,
+    route_message,
+)
+
+
+class FakePubSubManager(AsyncPubSubManager):
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self.published: List[bytes] = []
+
+    async def _publish(self, data):
+        self.published.append(pickle.dumps(data))
+
+    async def _listen(self):
+        for message in self.published:
+            yield message
+
+
+class BatchingFakeManager(BatchingPubSubMixin, FakePubSubManager):
+    pass
+
+
+@pytest.mark.services
+@pytest.mark.asyncio
+async def test_emits_are_coalesced_into_one_message():
+    manager = BatchingFakeManager(batch_window_ms=5, batch_max_size=100)
+
+    for i in range(3):
+        await manager.emit("task_info", {"i": i}, namespace="/task", room="20")
+    assert manager.published == [], "Emits should wait for the batch window"
+
+    await asyncio.sleep(0.02)
+    assert len(manager.published) == 1, f"Unexpected: {manager.published}"
+
+    messages = [message async for message in manager._listen()]
+    assert [m["data"] for m in messages] == [{"i": 0}, {"i": 1}, {"i": 2}]
+    assert all(m["method"] == "emit" for m in messages)
+
+
+@pytest.mark.services
+@pytest.mark.asyncio
+async def test_batch_flush_on_max_size_and_other_methods():
+    manager = BatchingFakeManager(batch_window_ms=1000, batch_max_size=2)
+
+    await manager.emit("task_info", 1, namespace="/task", room="20")
+    await manager.emit("task_info", 2, namespace="/task", room="20")
+    assert len(manager.published) == 1, "Full batch should be published at once"
+
+    await manager.emit("task_info", 3, namespace="/task", room="20")
+    await manager.close_room("20", namespace="/task")
+
+    messages = [message async for message in manager._listen()]
+    assert [m["method"] for m in messages] == ["emit", "emit", "emit", "close_room"]
+
+
+def create_room_routing_manager() -> RoomRoutingRedisManager:
+    manager = RoomRoutingRedisManager("redis://localhost:6379/0")
+    manager.redis = mock.AsyncMock()
+    manager.pubsub = mock.AsyncMock()
+    return manager
+
+
+@pytest.mark.services
+@pytest.mark.asyncio
+async def test_room_routing_subscribe_hosted_rooms():
+    manager = create_room_routing_manager()
+    channel = manager.room_channel("/task", "20")
+
+    manager.enter_room("sid", "/task", None, eio_sid="eio")
+    # A client's own room gets no channel
+    manager.enter_room("sid", "/task", "sid")
+    manager.enter_room("sid", "/task", "20")
+    await asyncio.sleep(0)
+    manager.pubsub.subscribe.assert_called_once_with(channel)
+
+    manager.leave_room("sid", "/task", "20")
+    await asyncio.sleep(0)
+    manager.pubsub.unsubscribe.assert_called_once_with(channel)
+
+
+@pytest.mark.services
+@pytest.mark.asyncio
+async def test_room_routing_publish_to_room_channel():
+    manager = create_room_routing_manager()
+
+    await manager.emit(
+        "task_status", {"state": "SUCCESS"}, namespace="/task", room="20"
+    )
+    await manager.emit("task_status", {"state": "SUCCESS"}, namespace="/task")
+
+    channels = [c.args[0] for c in manager.redis.publish.call_args_list]
+    assert channels == [
+        manager.room_channel("/task", "20"),
+        manager.channel,
+    ], f"Unexpected channels: {channels}"
+
+
+@pytest.mark.services
+@pytest.mark.asyncio
+async def test_room_routing_join_room_wait_subscribe():
+    manager = create_room_routing_manager()
+
+    manager.enter_room("sid", "/task", None, eio_sid="eio")
+    await manager.join_room("sid", "/task", "20")
+
+    manager.pubsub.subscribe.assert_awaited_once_with(
+        manager.room_channel("/task", "20")
+    )
+
+
+@pytest.mark.services
+@pytest.mark.asyncio
+async def test_room_routing_emit_to_local_sid():
+    manager = create_room_routing_manager()
+    manager.set_server(mock.AsyncMock())
+    manager.enter_room("sid", "/task", None, eio_sid="eio")
+    manager.enter_room("sid", "/task", "sid")
+
+    await manager.emit(
+        "task_status", {"state": "SUCCESS"}, namespace="/task", room="sid"
+    )
+
+    manager.redis.publish.assert_not_called()
+    manager.server._emit_internal.assert_awaited_once_with(
+        "eio", "task_status", {"state": "SUCCESS"}, "/task", None
+    )
+
+
+@pytest.mark.services
+@pytest.mark.asyncio
+async def test_room_routing_unsubscribed_room_to_main_channel():
+    manager = create_room_routing_manager()
+    # No node subscribed to the room channel, e.g. a client of another node
+    manager.redis.publish.return_value = 0
+
+    await manager.emit("task_status", {"state": "SUCCESS"}, namespace="/task", room="x")
+
+    channels = [c.args[0] for c in manager.redis.publish.call_args_list]
+    assert channels == [manager.room_channel("/task", "x"), manager.channel]
+
+
+@pytest.mark.services
+def test_route_message_split_batch_per_room():
+    batch = {
+        "method": "emit_batch",
+        "messages": [
+            {"method": "emit", "namespace": "/task", "room": "20", "data": 1},
+            {"method": "emit", "namespace": "/task", "room": "21", "data": 2},
+            {"method": "emit", "namespace": "/task", "room": "20", "data": 3},
+        ],
+    }
+
+    routes = dict(route_message("socketio", batch))
+
+    assert set(routes) == {"socketio#/task#20", "socketio#/task#21"}
+    assert [m["data"] for m in routes["socketio#/task#20"]["messages"]] == [1, 3]
+    assert routes["socketio#/task#21"]["data"] == 2
+
+
+@pytest.mark.services
+def test_socketio_emitter_publish_immediately():
+    manager = mock.Mock(host_id="host")
+    emitter = SocketioEmitter(manager)
+
+    emitter.emit("task_status", {"state": "SUCCESS"}, namespace="/task", room="20")
+
+    manager._publish.assert_called_once()
+    message = manager._publish.call_args.args[0]
+    assert message["room"] == "20" and message["host_id"] == "host"
+
+
+@pytest.mark.services
+def test_socketio_emitter_batch_window():
+    manager = mock.Mock(host_id="host")
+    emitter = SocketioEmitter(manager, batch_window_ms=10)
+
+    for i in range(3):
+        emitter.emit("task_status", i, namespace="/task", room="20")
+    manager._publish.assert_not_called()
+
+    time.sleep(0.1)
+    manager._publish.assert_called_once()
+    message = manager._publish.call_args.args[0]
+    assert message["method"] == "emit_batch" and len(message["messages"]) == 3
+
+
+@pytest.mark.services
+def test_socketio_emitter_replace_same_key():
+    manager = mock.Mock(host_id="host")
+    emitter = SocketioEmitter(manager, batch_window_ms=1000)
+
+    emitter.emit("task_status", "STARTED", namespace="/task", room="1", key="1")
+    emitter.emit("task_status", "STARTED", namespace="/task", room="2", key="2")
+    emitter.emit("task_status", "SUCCESS", namespace="/task", room="1", key="1")
+    emitter.flush()
+
+    message = manager._publish.call_args.args[0]
+    assert [m["data"] for m in message["messages"]] == ["SUCCESS", "STARTED"]
+
+
+@pytest.mark.services
+def test_socketio_emitter_conflation_window():
+    manager = mock.Mock(host_id="host")
+    emitter = SocketioEmitter(manager, conflation_window_ms=10)
+
+    emitter.emit("task_status", "STARTED", namespace="/task", room="1", key="1")
+    emitter.emit("task_status", "SUCCESS", namespace="/task", room="1", key="1")
+    # Emits without a key are not conflated
+    emitter.emit("task_info", "info", namespace="/task", room="2")
+    assert [c.args[0]["data"] for c in manager._publish.call_args_list] == ["info"]
+
+    time.sleep(0.1)
+    assert manager._publish.call_count == 2
+    assert manager._publish.call_args.args[0]["data"] == "SUCCESS"
+
+
+def create_bounded_server(**kwargs) -> BoundedAsyncServer:
+    server = BoundedAsyncServer(async_mode="asgi", max_send_queue=2, **kwargs)
+    server.eio.disconnect = mock.AsyncMock()
+    for sid, queued in (("slow", 2), ("fast", 0)):
+        socket = mock.Mock(queue=asyncio.Queue())
+        for i in range(queued):
+            socket.queue.put_nowait(i)
+        server.eio.sockets[sid] = socket
+    return server
+
+
+@pytest.mark.services
+@pytest.mark.asyncio
+async def test_bounded_server_drop_for_slow_client():
+    server = create_bounded_server()
+
+    with mock.patch("socketio.AsyncServer._emit_internal") as emit_internal:
+        await server._emit_internal("slow", "task_info", "a", namespace="/task")
+        await server._emit_internal("fast", "task_info", "b", namespace="/task")
+
+    emit_internal.assert_awaited_once_with(
+        "fast", "task_info", "b", namespace="/task", id=None
+    )
+    server.eio.disconnect.assert_not_awaited()
+    assert server.send_queue_stats() == {
+        "connections": 2,
+        "queued": 2,
+        "max_depth": 2,
+        "dropped": 1,
+        "disconnected": 0,
+    }
+
+
+@pytest.mark.services
+@pytest.mark.asyncio
+async def test_bounded_server_disconnect_slow_client():
+    server = create_bounded_server(disconnect_slow_clients=True)
+
+    with mock.patch("socketio.AsyncServer._emit_internal") as emit_internal:
+        await server._emit_internal("slow", "task_info", "a", namespace="/task")
+
+    emit_internal.assert_not_awaited()
+    server.eio.disconnect.assert_awaited_once_with("slow")
+    stats = server.send_queue_stats()
+    assert stats["dropped"] == 0 and stats["disconnected"] == 1, f"Unexpected: {stats}"
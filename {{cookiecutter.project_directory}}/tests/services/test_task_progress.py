@@ -0,0 +1,70 @@
+import pytest
+from unittest import mock
+
+# Application
+from app import services
+from app.socketio_managers import SocketioEmitter
+
+
+def create_reporter(total: int = 10, max_rate: float = 2):
+    task = mock.MagicMock()
+    task.request.id = "1"
+    emitter = mock.MagicMock(spec=services.TaskSocketioEmitter)
+    reporter = services.TaskProgressReporter(task, emitter, total, max_rate=max_rate)
+    return reporter, task, emitter
+
+
+@pytest.mark.worker
+def test_progress_throttle_keep_latest():
+    reporter, task, emitter = create_reporter()
+
+    with mock.patch("app.services.ws.time.monotonic") as monotonic:
+        monotonic.side_effect = [0.0, 0.1, 0.2, 0.6]
+        with reporter:
+            for step in range(1, 5):
+                reporter.update(step)
+
+    sent = [call.kwargs["meta"]["current"] for call in task.update_state.call_args_list]
+    # 2 and 3 arrive within 0.5s of 1 and are replaced by 4
+    assert sent == [1, 4], f"Unexpected progress updates: {sent}"
+    emitter.emit_task_status.assert_called_with(
+        task_id="1",
+        payload={"state": "PROGRESS", "progress": {"current": 4, "total": 10}},
+    )
+
+
+@pytest.mark.worker
+def test_progress_flush_pending_on_exit():
+    reporter, task, emitter = create_reporter()
+
+    with mock.patch("app.services.ws.time.monotonic") as monotonic:
+        monotonic.side_effect = [0.0, 0.1]
+        with reporter:
+            reporter.update(1)
+            reporter.update(2, stage="upload")
+
+    task.update_state.assert_called_with(
+        state="PROGRESS", meta={"current": 2, "total": 10, "stage": "upload"}
+    )
+    assert emitter.emit_task_status.call_count == 2
+
+
+@pytest.mark.worker
+def test_progress_conflated_by_worker_emitter():
+    manager = mock.Mock(host_id="host")
+    socketio_emitter = SocketioEmitter(manager, conflation_window_ms=1000)
+    emitter = services.TaskSocketioEmitter(socketio_emitter)
+    task = mock.MagicMock()
+    task.request.id = "1"
+
+    with services.TaskProgressReporter(task, emitter, total=3, max_rate=0) as reporter:
+        for step in range(1, 4):
+            reporter.update(step)
+    emitter.emit_task_status(task_id="1", payload={"state": "SUCCESS"})
+    manager._publish.assert_not_called()
+
+    socketio_emitter.flush()
+    # Every progress update was replaced by the final state
+    manager._publish.assert_called_once()
+    message = manager._publish.call_args.args[0]
+    assert message["room"] == "1" and message["data"] == {"state": "SUCCESS"}
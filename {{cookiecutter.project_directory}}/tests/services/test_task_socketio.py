@@ -0,0 +1,52 @@
+import pytest
+from unittest import mock
+
+# Application
+from app import repositories, services
+
+
+@pytest.mark.services
+@pytest.mark.asyncio
+async def test_emit_task_status():
+    socketio_client = mock.AsyncMock()
+    manager = services.TaskSocketioManager(socketio_client)
+
+    await manager.emit_task_status(task_id="1", payload={"state": "STARTED"})
+    await manager.emit_task_status(task_id="1", payload={"state": "SUCCESS"})
+
+    assert socketio_client.emit.call_count == 2
+
+
+@pytest.mark.services
+@pytest.mark.asyncio
+async def test_emit_msgpack_sub_room():
+    msgpack = pytest.importorskip("msgpack")
+    socketio_client = mock.AsyncMock()
+    manager = services.TaskSocketioManager(socketio_client, msgpack=True)
+
+    assert manager.room_for("20", "msgpack") == "20:msgpack"
+    assert manager.room_for("20", None) == "20"
+
+    await manager.emit_task_info(payload={"i": 1}, room_id="20")
+    emitted = {
+        c.kwargs["room"]: c.kwargs["data"] for c in socketio_client.emit.call_args_list
+    }
+    assert emitted == {"20": {"i": 1}, "20:msgpack": msgpack.packb({"i": 1})}
+
+
+@pytest.mark.services
+@pytest.mark.asyncio
+async def test_emit_task_info_with_seq_and_replay():
+    socketio_client = mock.AsyncMock()
+    manager = services.TaskSocketioManager(
+        socketio_client, replay_buffer=repositories.MemoryReplayBuffer()
+    )
+
+    await manager.emit_task_info(payload={"i": 1}, room_id="20")
+    await manager.emit_task_info(payload={"i": 2}, room_id="20")
+
+    emitted = [c.kwargs["data"] for c in socketio_client.emit.call_args_list]
+    assert emitted == [({"i": 1}, 1), ({"i": 2}, 2)], f"Unexpected emits: {emitted}"
+
+    missed = await manager.replay_task_info("20", last_seq=1)
+    assert missed == [{"seq": 2, "data": {"i": 2}}], f"Unexpected replay: {missed}"
@@ -0,0 +1,80 @@
+import asyncio
+import pytest
+from unittest import mock
+
+# Application
+from app import services
+
+
+def create_notifier():
+    messages: asyncio.Queue = asyncio.Queue()
+
+    async def listen():
+        while True:
+            yield await messages.get()
+
+    pubsub = mock.MagicMock()
+    pubsub.subscribe = mock.AsyncMock()
+    pubsub.unsubscribe = mock.AsyncMock()
+    pubsub.reset = mock.AsyncMock()
+    pubsub.listen = listen
+
+    task_result_cache = mock.MagicMock()
+    task_result_cache.pubsub.return_value = pubsub
+    task_result_cache.channel.side_effect = lambda task_id: f"meta-{task_id}".encode()
+    task_result_cache.task_id_from_channel.side_effect = lambda c: c.decode()[5:]
+    task_result_cache.decode.side_effect = lambda data: data
+
+    task_status_service = mock.MagicMock()
+    task_status_service.get_task_info = mock.AsyncMock(return_value=None)
+    task_status_service.to_task_info.side_effect = lambda meta: meta
+
+    websocket_manager = mock.MagicMock()
+    websocket_manager.send = mock.AsyncMock()
+    websocket_manager.broadcast = mock.AsyncMock()
+
+    notifier = services.TaskStatusNotifier(
+        task_result_cache, task_status_service, websocket_manager
+    )
+    return notifier, pubsub, messages, websocket_manager
+
+
+@pytest.mark.services
+@pytest.mark.asyncio
+async def test_notifier_subscribe_while_watched():
+    notifier, pubsub, _, _ = create_notifier()
+
+    await notifier.watch("ws1", task_id="1")
+    await notifier.watch("ws2", task_id="1")
+    pubsub.subscribe.assert_awaited_once_with(b"meta-1")
+
+    await notifier.unwatch("ws1", task_id="1")
+    pubsub.unsubscribe.assert_not_awaited()
+    await notifier.unwatch("ws2", task_id="1")
+    pubsub.unsubscribe.assert_awaited_once_with(b"meta-1")
+    await notifier.close()
+
+
+@pytest.mark.services
+@pytest.mark.asyncio
+async def test_notifier_unsubscribe_finished_task():
+    notifier, pubsub, messages, websocket_manager = create_notifier()
+    await notifier.watch("ws1", task_id="1")
+
+    await messages.put(
+        {"type": "message", "channel": b"meta-1", "data": {"status": "SUCCESS"}}
+    )
+    await asyncio.sleep(0.01)
+    websocket_manager.broadcast.assert_awaited_once()
+    pubsub.unsubscribe.assert_awaited_once_with(b"meta-1")
+
+    # A watcher arriving after the task finished subscribes again
+    await notifier.watch("ws2", task_id="1")
+    assert pubsub.subscribe.await_count == 2
+
+    # Unsubscribed once the last watcher, not the first, leaves
+    await notifier.unwatch("ws1", task_id="1")
+    assert pubsub.unsubscribe.await_count == 1
+    await notifier.unwatch("ws2", task_id="1")
+    assert pubsub.unsubscribe.await_count == 2
+    await notifier.close()
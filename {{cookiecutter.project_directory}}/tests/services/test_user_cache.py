@@ -0,0 +1,53 @@
+import asyncio
+import pytest
+from fakeredis import aioredis as fakeredis
+
+# Application
+from app.repositories import UserCache
+
+
+def create_user_cache(redis_client) -> UserCache:
+    return UserCache(redis_client, expired_time_min=1, local_cache_ttl_seconds=60)
+
+
+@pytest.mark.services
+@pytest.mark.asyncio
+async def test_user_cache_local_tier_after_subscribe():
+    redis_client = fakeredis.FakeRedis(decode_responses=True)
+    user_cache = create_user_cache(redis_client)
+    await redis_client.set("user:1", "first")
+
+    # Not subscribed yet, reads are not kept locally
+    assert await user_cache.get(1) == "first"
+    await redis_client.set("user:1", "second")
+    assert await user_cache.get(1) == "second"
+
+    await user_cache.start()
+    assert await user_cache.get(1) == "second"
+    await redis_client.set("user:1", "third")
+    # Served from the local tier
+    assert await user_cache.get(1) == "second"
+
+    await user_cache.close()
+    assert await user_cache.get(1) == "third"
+
+
+@pytest.mark.services
+@pytest.mark.asyncio
+async def test_user_cache_delete_invalidate_other_replicas():
+    redis_client = fakeredis.FakeRedis(decode_responses=True)
+    replica, other = create_user_cache(redis_client), create_user_cache(redis_client)
+    await replica.start()
+    await other.start()
+
+    await redis_client.set("user:1", "first")
+    assert await replica.get(1) == "first"
+
+    await other.delete(1)
+    await redis_client.set("user:1", "second")
+    await asyncio.sleep(0.05)
+
+    # The local copy was dropped, the read goes to redis again
+    assert await replica.get(1) == "second"
+    await replica.close()
+    await other.close()
@@ -0,0 +1,60 @@
+import pytest
+from unittest import mock
+from fastapi import WebSocket
+
+# Application
+from app import services
+from app.websocket_broadcast import MemoryBroadcaster
+
+
+def create_websocket_mock() -> mock.AsyncMock:
+    return mock.AsyncMock(spec=WebSocket)
+
+
+@pytest.mark.websocket
+@pytest.mark.asyncio
+async def test_publish_reach_other_process():
+    # Two managers on one broadcaster channel act as two app processes
+    node_a = services.TaskWebsocketManager(broadcaster=MemoryBroadcaster("test"))
+    node_b = services.TaskWebsocketManager(broadcaster=MemoryBroadcaster("test"))
+    await node_a.start()
+    await node_b.start()
+
+    sender, local_peer, remote_peer, remote_other = (
+        create_websocket_mock() for _ in range(4)
+    )
+    await node_a.connect(sender, room="20")
+    await node_a.connect(local_peer, room="20")
+    await node_b.connect(remote_peer, room="20")
+    await node_b.connect(remote_other, room="21")
+
+    sent = await node_a.publish("20", "hello", exclude=sender)
+    await node_a.drain()
+    await node_b.drain()
+    await node_a.close()
+    await node_b.close()
+
+    assert sent == 1, f"Unexpected local sent count: {sent}"
+    local_peer.send_text.assert_called_once_with("hello")
+    remote_peer.send_text.assert_called_once_with("hello")
+    sender.send_text.assert_not_called()
+    remote_other.send_text.assert_not_called()
+
+
+@pytest.mark.websocket
+@pytest.mark.asyncio
+async def test_broadcast_stay_local():
+    node_a = services.TaskWebsocketManager(broadcaster=MemoryBroadcaster("test"))
+    node_b = services.TaskWebsocketManager(broadcaster=MemoryBroadcaster("test"))
+    await node_a.start()
+    await node_b.start()
+
+    remote_peer = create_websocket_mock()
+    await node_b.connect(remote_peer, room="20")
+
+    await node_a.broadcast("20", "hello")
+    await node_b.drain()
+    await node_a.close()
+    await node_b.close()
+
+    remote_peer.send_text.assert_not_called()
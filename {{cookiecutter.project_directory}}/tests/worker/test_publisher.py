@@ -0,0 +1,58 @@
+import pytest
+from unittest import mock
+
+# Application
+from app.broker import TaskPublisher
+
+
+@pytest.mark.worker
+@pytest.mark.asyncio
+async def test_publisher_reuse_producer():
+    celery_app = mock.MagicMock()
+    producer = celery_app.producer_pool.acquire.return_value
+    signature = mock.MagicMock()
+    signature.apply_async.return_value.id = "task-id"
+
+    publisher = TaskPublisher(celery_app)
+    for _ in range(3):
+        result = await publisher.apply_async(signature, queue="p2")
+        assert result.id == "task-id", f"Unexpected task id: {result.id}"
+
+    publisher.shutdown()
+
+    celery_app.producer_pool.acquire.assert_called_once()
+    signature.apply_async.assert_called_with(producer=producer, queue="p2")
+    producer.release.assert_called_once()
+    assert publisher.published == 3, f"Unexpected published: {publisher.published}"
+
+
+@pytest.mark.worker
+@pytest.mark.asyncio
+async def test_publisher_raise_publish_error():
+    signature = mock.MagicMock()
+    signature.apply_async.side_effect = ConnectionError("broker down")
+
+    publisher = TaskPublisher(mock.MagicMock())
+    with pytest.raises(ConnectionError):
+        await publisher.apply_async(signature)
+    publisher.shutdown()
+
+    assert publisher.failed == 1, f"Unexpected failed: {publisher.failed}"
+
+
+@pytest.mark.worker
+@pytest.mark.asyncio
+async def test_publisher_apply_many_on_one_producer():
+    celery_app = mock.MagicMock()
+    producer = celery_app.producer_pool.acquire.return_value
+    signatures = [mock.MagicMock() for _ in range(3)]
+
+    publisher = TaskPublisher(celery_app)
+    results = await publisher.apply_many(signatures)
+    publisher.shutdown()
+
+    assert results == [s.apply_async.return_value for s in signatures]
+    for signature in signatures:
+        signature.apply_async.assert_called_once_with(producer=producer)
+    celery_app.producer_pool.acquire.assert_called_once()
+    assert publisher.published == 3, f"Unexpected published: {publisher.published}"
@@ -0,0 +1,16 @@
+import pytest
+
+# Application
+from app.main import celery
+from app.broker import tasks
+
+
+@pytest.mark.worker
+@pytest.mark.parametrize(
+    "task, queue",
+    [(tasks.health_check, "p1"), (tasks.long_trip_event, "p2")],
+)
+def test_task_routes(task, queue):
+    route = celery.amqp.router.route({}, task.name)
+
+    assert route["queue"].name == queue, f"Unexpected queue: {route['queue']}"
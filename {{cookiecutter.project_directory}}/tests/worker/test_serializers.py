@@ -0,0 +1,42 @@
+import pytest
+from datetime import date, datetime, timezone
+from uuid import uuid4
+from kombu import serialization
+
+# Application
+from app.broker.serializers import (
+    MSGPACK_EXT,
+    MSGPACK_EXT_CONTENT_TYPE,
+    register_msgpack_ext,
+)
+
+
+@pytest.mark.worker
+def test_msgpack_ext_round_trip():
+    register_msgpack_ext()
+    payload = {
+        "task_id": uuid4(),
+        "date_done": datetime.now(timezone.utc),
+        "naive": datetime(2022, 5, 1, 12, 30),
+        "day": date(2022, 5, 1),
+        "args": [1, "a", None, 1.5],
+        "blob": b"\x00\x01",
+    }
+
+    content_type, content_encoding, data = serialization.dumps(
+        payload, serializer=MSGPACK_EXT
+    )
+    assert content_type == MSGPACK_EXT_CONTENT_TYPE
+
+    result = serialization.loads(
+        data, content_type, content_encoding, accept=[MSGPACK_EXT_CONTENT_TYPE]
+    )
+    assert result == payload, f"Unexpected result: {result}"
+
+
+@pytest.mark.worker
+def test_msgpack_ext_reject_unknown_type():
+    register_msgpack_ext()
+
+    with pytest.raises(Exception):
+        serialization.dumps({"obj": object()}, serializer=MSGPACK_EXT)
@@ -0,0 +1,39 @@
+import pytest
+from unittest import mock
+
+# Application
+from app import repositories
+
+
+def create_redis_mock(fields) -> mock.MagicMock:
+    redis_client = mock.MagicMock()
+    redis_client.register_script.return_value.return_value = fields
+    return redis_client
+
+
+@pytest.mark.worker
+def test_task_group_counter_finish():
+    redis_client = create_redis_mock(
+        [b"total", b"3", b"completed", b"1", b"failed", b"1"]
+    )
+    counter = repositories.TaskGroupCounter(redis_client)
+
+    progress = counter.finish("group", failed=True)
+
+    assert progress == {
+        "group_id": "group",
+        "total": 3,
+        "completed": 1,
+        "failed": 1,
+    }, f"Unexpected progress: {progress}"
+    finish = redis_client.register_script.return_value
+    finish.assert_called_once_with(keys=["task-group:group"], args=[1])
+
+
+@pytest.mark.worker
+def test_task_group_counter_skip_unknown_group():
+    # The script returns nil when the hash does not exist
+    redis_client = create_redis_mock(None)
+    counter = repositories.TaskGroupCounter(redis_client)
+
+    assert counter.finish("group") is None
@@ -0,0 +1,31 @@
+import pytest
+from celery import Celery
+from unittest import mock
+
+# Application
+from app.broker import TaskPublisher, task_pipelines, tasks
+from app.constants import TaskPriority
+
+
+@pytest.mark.worker
+@pytest.mark.asyncio
+async def test_long_trip_batch_without_result_backend():
+    publisher = mock.AsyncMock(spec=TaskPublisher)
+    task_group_service = mock.AsyncMock()
+    specs = [(10, None), (12, TaskPriority.HIGH)]
+
+    # Subscribing results from the API would block the event loop and leak
+    with mock.patch.object(
+        Celery, "backend", new_callable=mock.PropertyMock
+    ) as backend:
+        backend.side_effect = AssertionError("The result backend was used")
+        group_id, task_ids = await task_pipelines.long_trip_batch(
+            publisher, task_group_service, specs
+        )
+
+    task_group_service.create_group.assert_awaited_once_with(group_id, 2)
+    signatures = publisher.apply_many.await_args.args[0]
+    assert [s.id for s in signatures] == task_ids, f"Unexpected: {signatures}"
+    assert {s.options["group_id"] for s in signatures} == {group_id}
+    assert [s.options.get("queue") for s in signatures] == [None, "p1"]
+    assert all(s.task == tasks.long_trip_event.name for s in signatures)